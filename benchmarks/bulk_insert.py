@@ -0,0 +1,95 @@
+"""
+Per-row SqlLayer.insert vs insert_many / upsert_many.
+
+Runs against the database configured for the app (DB_URI / POSTGRES_*):
+
+    cd src && python ../benchmarks/bulk_insert.py --rows 5000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import delete  # noqa: E402
+
+from database import Base, async_session_maker, engine  # noqa: E402
+from models import user_model  # noqa: E402,F401
+from models.product_model import Category  # noqa: E402
+from repositories.product_repo import CategoryRepository  # noqa: E402
+
+
+def make_rows(prefix: str, count: int) -> list[dict]:
+    return [
+        {"name": f"{prefix}-{i}", "description": "benchmark row"} for i in range(count)
+    ]
+
+
+async def cleanup(prefix: str) -> None:
+    async with async_session_maker() as session:
+        await session.execute(delete(Category).where(Category.name.like(f"{prefix}-%")))
+        await session.commit()
+
+
+async def timed(label: str, rows: int, coro) -> None:
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f}s  {rows / elapsed:10.0f} rows/s")
+
+
+async def main(rows: int, chunk_size: int) -> None:
+    repo = CategoryRepository()
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+
+    async def per_row():
+        for row in make_rows(prefix, rows):
+            await repo.insert(data=row)
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        await timed("insert (per row)", rows, per_row())
+        await cleanup(prefix)
+        await timed(
+            "insert_many (returning)",
+            rows,
+            repo.insert_many(make_rows(prefix, rows), chunk_size=chunk_size),
+        )
+        await cleanup(prefix)
+        await timed(
+            "insert_many (no returning)",
+            rows,
+            repo.insert_many(
+                make_rows(prefix, rows), chunk_size=chunk_size, returning=False
+            ),
+        )
+        existing = await repo.get_all()
+        upserts = [
+            {**row, "description": "upserted"}
+            for row in existing
+            if row["name"].startswith(prefix)
+        ]
+        await timed(
+            "upsert_many (all conflicts)",
+            len(upserts),
+            repo.upsert_many(
+                upserts, conflict_cols=["category_id"], chunk_size=chunk_size
+            ),
+        )
+    finally:
+        await cleanup(prefix)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.chunk_size))
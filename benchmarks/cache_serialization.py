@@ -0,0 +1,124 @@
+"""
+Payload size and encode/decode time of cached values: the old RedisManager
+JSON encoding vs the pluggable serializers, on a UserModel.to_dict() payload
+and a page of product cards built from Product.to_dict(). No Redis needed.
+
+    cd src && python ../benchmarks/cache_serialization.py
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import timeit
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from models.product_model import Product  # noqa: E402
+from models.user_model import UserModel  # noqa: E402
+from utils.serializers import JsonSerializer, MsgpackSerializer  # noqa: E402
+
+
+class LegacyJson:
+    """What RedisManager.dumps/loads did before serializers were pluggable."""
+
+    @staticmethod
+    def dumps(data):
+        if isinstance(data, dict):
+            data = {
+                k: str(v) if isinstance(v, (uuid.UUID, datetime)) else v
+                for k, v in data.items()
+            }
+        return json.dumps(data).encode()
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+async def user_payload() -> dict:
+    now = datetime.now()
+    user = UserModel(
+        id=uuid.uuid4(),
+        username="bench",
+        email="bench@example.com",
+        first_name="Bench",
+        last_name="User",
+        about="Lorem ipsum dolor sit amet. " * 8,
+        avatar="https://example.com/avatars/bench.webp",
+        phone="+380000000000",
+        birth_date=date(1990, 1, 1),
+        created_at=now,
+        updated_at=now,
+        is_activate=True,
+        is_locked=False,
+        hash_password="$2b$12$" + "x" * 53,
+    )
+    return await user.to_dict()
+
+
+async def product_cards(count: int = 24) -> list[dict]:
+    cards = []
+    for i in range(count):
+        product = Product(
+            product_id=i,
+            name=f"Product {i}",
+            description="Full product description. " * 20,
+            small_description="Short description of the product.",
+            price=Decimal("499.90"),
+            availability=True,
+            currency="UAH",
+            in_stock=True,
+            stock_quantity=10,
+            category_id=1,
+            subcategory_id=2,
+            product_image=f"https://example.com/products/{i}.webp",
+            brand_id=3,
+            is_certified=False,
+            certification_info=None,
+            benefits="Benefits of the product. " * 5,
+            usage_instructions="How to use the product. " * 5,
+        )
+        cards.append(await product.to_dict())
+    return cards
+
+
+def main(number: int) -> None:
+    payloads = {
+        "user": asyncio.run(user_payload()),
+        "product cards": asyncio.run(product_cards()),
+    }
+    serializers = {
+        "legacy json": LegacyJson(),
+        "json": JsonSerializer(),
+        "msgpack": MsgpackSerializer(),
+        "msgpack+zlib": MsgpackSerializer(compress_threshold=256),
+    }
+
+    print(
+        f"{'payload':<14} {'serializer':<14} {'bytes':>7} {'dumps us':>9} {'loads us':>9}"
+    )
+    for payload_name, payload in payloads.items():
+        for name, serializer in serializers.items():
+            try:
+                encoded = serializer.dumps(payload)
+            except TypeError:
+                print(f"{payload_name:<14} {name:<14} {'cannot encode':>27}")
+                continue
+            dumps = timeit.timeit(lambda: serializer.dumps(payload), number=number)
+            loads = timeit.timeit(lambda: serializer.loads(encoded), number=number)
+            print(
+                f"{payload_name:<14} {name:<14} {len(encoded):>7} "
+                f"{dumps / number * 1e6:>9.2f} {loads / number * 1e6:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.number)
@@ -0,0 +1,177 @@
+"""
+Load test for cache stampedes on a hot key, against the Redis from .env.
+The "database" is a coroutine that sleeps for --load-ms and counts calls.
+
+burst:  the key is expired, then --workers processes fire --concurrency
+        concurrent reads each; reports how many reached the database.
+        naive = plain get/load/set, single-flight = per-process coalescing,
+        single-flight+lock = coalescing across workers via the Redis lock.
+steady: one process reads a key with a short TTL for --duration seconds,
+        with and without XFetch early refresh; reports database calls and
+        requests that stalled on a recomputation.
+
+    cd src && python ../benchmarks/cache_stampede.py
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import config_setting  # noqa: E402
+from utils.cache_aside import cache_aside  # noqa: E402
+from utils.cache_manager import (  # noqa: E402
+    close_cache_manager,
+    close_redis_pool,
+    get_cache_manager,
+)
+
+
+KEY = "bench:hot"
+
+
+async def shutdown() -> None:
+    # Every asyncio.run() needs fresh connections.
+    await close_cache_manager()
+    await close_redis_pool()
+
+
+class Database:
+    def __init__(self, load_ms: float) -> None:
+        self.load_ms = load_ms
+        self.calls = 0
+
+    async def query(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.load_ms / 1000)
+        return {"products": list(range(12)), "total_count": 12}
+
+
+async def naive_read(db: Database, ttl: int) -> dict:
+    cache = get_cache_manager()
+    value = await cache.get(token=f"cache:{KEY}")
+    if value is None:
+        value = await db.query()
+        await cache.set(token=f"cache:{KEY}", data=value, exp=ttl)
+    return value
+
+
+async def read(mode: str, db: Database, ttl: int) -> float:
+    started = time.perf_counter()
+    if mode == "naive":
+        await naive_read(db, ttl)
+    else:
+        await cache_aside(
+            key=KEY, load=db.query, ttl=ttl, lock=mode == "single-flight+lock"
+        )
+    return time.perf_counter() - started
+
+
+async def burst_worker(mode: str, start_at: float, args) -> tuple[int, list]:
+    db = Database(args.load_ms)
+    await asyncio.sleep(max(0, start_at - time.time()))
+    latencies = await asyncio.gather(
+        *(read(mode, db, ttl=60) for _ in range(args.concurrency))
+    )
+    await shutdown()
+    return db.calls, latencies
+
+
+def run_burst_worker(mode, start_at, args, results) -> None:
+    try:
+        results.put(asyncio.run(burst_worker(mode, start_at, args)))
+    except Exception as e:
+        results.put(e)
+
+
+async def expire_hot_key() -> None:
+    cache = get_cache_manager()
+    for token in (f"cache:{KEY}", f"lock:{KEY}"):
+        await cache.delete(token=token)
+    await shutdown()
+
+
+def burst(args) -> None:
+    print(f"burst: {args.workers} workers x {args.concurrency} concurrent reads")
+    for mode in ("naive", "single-flight", "single-flight+lock"):
+        asyncio.run(expire_hot_key())
+        results = multiprocessing.Queue()
+        start_at = time.time() + 1
+        workers = [
+            multiprocessing.Process(
+                target=run_burst_worker, args=(mode, start_at, args, results)
+            )
+            for _ in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                raise outcome
+
+        calls = sum(calls for calls, _ in outcomes)
+        latencies = sorted(l for _, ls in outcomes for l in ls)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"  {mode:<20} db calls {calls:>5}   "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+            f"p99 {p99 * 1000:7.1f} ms"
+        )
+
+
+async def steady_run(beta: float, args) -> tuple[int, int, int]:
+    config_setting.CACHE_XFETCH_BETA = beta
+    await expire_hot_key()
+    db = Database(args.load_ms)
+    deadline = time.monotonic() + args.duration
+    requests = stalls = 0
+
+    async def client():
+        nonlocal requests, stalls
+        while time.monotonic() < deadline:
+            latency = await read("single-flight", db, ttl=args.ttl)
+            requests += 1
+            if latency >= args.load_ms / 1000 / 2:
+                stalls += 1
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    await shutdown()
+    return requests, db.calls, stalls
+
+
+def steady(args) -> None:
+    print(
+        f"steady: {args.concurrency} clients, ttl {args.ttl}s, "
+        f"{args.duration}s, load {args.load_ms} ms"
+    )
+    for label, beta in (("expire only", 0.0), ("xfetch beta=1", 1.0)):
+        requests, calls, stalls = asyncio.run(steady_run(beta, args))
+        print(
+            f"  {label:<20} requests {requests:>7}   db calls {calls:>4}   "
+            f"stalled {stalls:>5}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--load-ms", type=float, default=100)
+    parser.add_argument("--ttl", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+    print(
+        f"redis {config_setting.REDIS_HOST}:{config_setting.REDIS_PORT}, "
+        f"lock ttl {config_setting.CACHE_LOCK_TTL}s"
+    )
+    burst(args)
+    steady(args)
@@ -0,0 +1,93 @@
+"""
+Encode/decode throughput of access tokens for each supported algorithm:
+the old JWTAuth path (jwt.encode/jwt.decode with the raw key on every call)
+vs TokenCodec with keys prepared once. ES256 and EdDSA need cryptography.
+
+    cd src && python ../benchmarks/jwt_throughput.py
+"""
+
+import argparse
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import jwt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.tokens import (  # noqa: E402
+    ASYMMETRIC_ALGORITHMS,
+    SYMMETRIC_ALGORITHMS,
+    TokenCodec,
+    generate_private_key,
+)
+
+
+SECRET = "bench-secret-" + "x" * 32
+
+
+def claims() -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=15),
+    }
+
+
+def public_pem(codec: TokenCodec) -> bytes:
+    from cryptography.hazmat.primitives import serialization
+
+    return codec.verify_key.public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+
+
+def codecs() -> dict:
+    """algorithm -> (raw signing key, raw verifying key, codec)"""
+    found = {}
+    for algorithm in SYMMETRIC_ALGORITHMS[:1] + ASYMMETRIC_ALGORITHMS:
+        try:
+            if algorithm in SYMMETRIC_ALGORITHMS:
+                codec = TokenCodec(algorithm, secret=SECRET)
+                found[algorithm] = (SECRET, SECRET, codec)
+            else:
+                pem = generate_private_key(algorithm)
+                codec = TokenCodec(algorithm, private_key=pem)
+                found[algorithm] = (pem, public_pem(codec), codec)
+        except (ImportError, ValueError) as e:
+            print(f"{algorithm}: skipped ({e})")
+    return found
+
+
+def main(number: int) -> None:
+    payload = claims()
+    print(f"{'algorithm':<10} {'path':<10} {'encode/s':>10} {'decode/s':>10}")
+    for algorithm, (signing_key, verifying_key, codec) in codecs().items():
+        token = codec.encode(payload)
+        paths = {
+            # What JWTAuth did before: the raw key, parsed again on every call.
+            "raw key": (
+                lambda: jwt.encode(payload, signing_key, algorithm=algorithm),
+                lambda: jwt.decode(token, verifying_key, algorithms=[algorithm]),
+            ),
+            "prepared": (
+                lambda: codec.encode(payload),
+                lambda: codec.decode(token),
+            ),
+        }
+        for path, (encode, decode) in paths.items():
+            encode_s = timeit.timeit(encode, number=number)
+            decode_s = timeit.timeit(decode, number=number)
+            print(
+                f"{algorithm:<10} {path:<10} "
+                f"{number / encode_s:>10.0f} {number / decode_s:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.number)
@@ -0,0 +1,86 @@
+"""
+Per-call logging overhead of the repository hot path: the old f-string
+messages written by a synchronous StreamHandler vs SqlLayer._log() going
+through the queue handler. Output goes to /dev/null; no database needed.
+
+    cd src && python ../benchmarks/repository_logging.py
+"""
+
+import argparse
+import logging
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from repositories.user_repo import UserRepository  # noqa: E402
+from utils import logging as app_logging  # noqa: E402
+
+
+def user_row() -> dict:
+    now = datetime.now()
+    return {
+        "id": uuid.uuid4(),
+        "username": "bench",
+        "email": "bench@example.com",
+        "first_name": "Bench",
+        "last_name": "User",
+        "about": "x" * 200,
+        "avatar": "https://example.com/avatar.webp",
+        "phone": "+380000000000",
+        "birth_date": now,
+        "created_at": now,
+        "update_at": now,
+        "is_activate": True,
+        "is_locked": False,
+        "hash_password": "$2b$12$" + "x" * 53,
+    }
+
+
+def main(number: int) -> None:
+    devnull = open(os.devnull, "w")
+
+    legacy = logging.getLogger("bench.legacy")
+    legacy.propagate = False
+    legacy_handler = logging.StreamHandler(devnull)
+    legacy_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    legacy.addHandler(legacy_handler)
+
+    app_logging.consoleHandler.setStream(devnull)
+    logger = app_logging.get_logger()
+    repo = UserRepository()
+    data = user_row()
+    filters = {"id": data["id"]}
+    name = UserRepository.model.__name__
+
+    def old_style():
+        legacy.info(f"DATA UPDATED: {name} with data: {data}, {()}, {filters}")
+
+    def new_style():
+        repo._log(logging.INFO, "DATA UPDATED", data=data, filters=filters)
+
+    for level in (logging.INFO, logging.WARNING):
+        legacy.setLevel(level)
+        logger.setLevel(level)
+        for label, fn in (
+            ("f-string + StreamHandler", old_style),
+            ("_log + queue", new_style),
+        ):
+            seconds = timeit.timeit(fn, number=number)
+            print(
+                f"{logging.getLevelName(level):<8} {label:<26} "
+                f"{seconds / number * 1e6:8.2f} us/call"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.number)
@@ -2,11 +2,13 @@ from .v1.endpoints.health import router as health_router
 from .v1.endpoints.auth import router as auth_router
 from .v1.endpoints.user_profile import router as one_user_router
 from .v1.endpoints.product import router as product_router
+from .v1.endpoints.well_known import router as well_known_router
 
 
 routers = [
     health_router,
     auth_router,
     one_user_router,
-    product_router
+    product_router,
+    well_known_router,
 ]
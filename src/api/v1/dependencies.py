@@ -1,67 +1,72 @@
+import uuid
 from typing import Annotated
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 
 from services.auth_service import AuthService
 from services.user_service import UserService
-from repositories.user_repo import UserRepository, TokenRepository
-from core.security import JWTAuth
-from utils.cache_manager import RedisManager
-from utils.template_render import get_template
-
-from utils.email_manager import MetaUaSender
 from services.load_service import LoadService
 
-from core.security import SecurityBase
+from config import config_setting
+from core.container import Container
+from database import unit_of_work
+from utils.loader import loader_scope
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def auth_dep() -> AuthService:
-    return AuthService(
-        user_repo=UserRepository,
-        refresh_repo=TokenRepository,
-        cache_manager=RedisManager,
-        email_manager=MetaUaSender,
-        security_layer=JWTAuth,
-        error_handler=HTTPException,
-        template_handler=get_template,
-    )
+async def get_unit_of_work():
+    async with unit_of_work() as session:
+        yield session
+
+
+async def get_loaders():
+    async with loader_scope() as loaders:
+        yield loaders
+
+
+def get_container(request: Request) -> Container:
+    return request.app.state.container
+
+
+async def auth_dep(request: Request) -> AuthService:
+    return get_container(request).auth_service
 
 
 # email_manager=AwsSender,
 
 
-async def user_dep() -> UserService:
-    return UserService(
-        user_repo=UserRepository(),
-        error_handler=HTTPException,
-        token_repo=TokenRepository(),
-        security_layer=SecurityBase(),
-    )
+async def user_dep(request: Request) -> UserService:
+    return get_container(request).user_service
 
 
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    service=Depends(auth_dep),
+    service=Depends(user_dep),
 ):
     try:
         payload = await service.security_layer.decode_token(token=token)
         if not payload:
             raise HTTPException(status_code=401, detail="Несанкціонований доступ")
 
-        user_id = payload.get("id")
+        user_id = uuid.UUID(str(payload.get("id")))
 
-        user = await service.user_repo.get(id=user_id)
+        user = await service.get_current_user(user_id=user_id)
         if user is None or user is False:
             raise HTTPException(status_code=404, detail="Користувача не знайдено")
         return user
     except ValueError:
         raise HTTPException(status_code=401, detail="Несанкціонований доступ")
+
+
+async def get_admin_user(user=Depends(get_current_user)):
+    if user.get("role_id") != config_setting.ADMIN_ROLE_ID:
+        raise HTTPException(status_code=403, detail="Доступ заборонено")
+    return user
     
 
-async def get_load_service() -> LoadService:
-    return LoadService()
+async def get_load_service(request: Request) -> LoadService:
+    return get_container(request).load_service
 
 
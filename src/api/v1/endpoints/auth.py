@@ -11,11 +11,16 @@ from schemas.auth_schema import (
     ChangePassword,
 )
 from services.auth_service import AuthService
-from api.v1.dependencies import auth_dep
+from api.v1.dependencies import auth_dep, get_unit_of_work, get_loaders
 from config import config_setting
+from utils.rate_limiter import RateLimit
 
 
-router = APIRouter(prefix="/auth", tags=["Auth"])
+router = APIRouter(
+    prefix="/auth",
+    tags=["Auth"],
+    dependencies=[Depends(get_loaders), Depends(get_unit_of_work)],
+)
 
 auth_depends = Annotated[AuthService, Depends(auth_dep)]
 
@@ -23,11 +28,16 @@ auth_depends = Annotated[AuthService, Depends(auth_dep)]
 @router.post(
     "/register",
     status_code=status.HTTP_201_CREATED,
+    dependencies=[
+        Depends(RateLimit("register", limit=10, window=3600, by="ip")),
+        Depends(RateLimit("register", limit=3, window=3600, by="email")),
+    ],
     responses={
         201: {"description": "Повідомлення надіслано"}, 
         400: {"description": "Паролі не збігаються"},
         405: {"description": "Метод заборонено"},
         409: {"description": "Електронна пошта вже існує"},
+        429: {"description": "Забагато запитів"},
         500: {"description": "Упс! Щось пішло не так. Спробуйте пізніше"},
     },
 )
@@ -71,9 +81,14 @@ async def verify_email(
 @router.post(
     "/login",
     status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimit("login", limit=20, window=60, by="ip")),
+        Depends(RateLimit("login", limit=5, window=60, by="email")),
+    ],
     responses={
         400: {"description": "Недійсне ім'я користувача або пароль"},
         405: {"description": "Метод заборонено"},
+        429: {"description": "Забагато запитів"},
         500: {"description": "Упс! Щось пішло не так. Спробуйте пізніше"},
     },
 )
@@ -102,6 +117,10 @@ async def login(
 @router.get(
     "/resend_email/{user_id}",
     status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimit("resend_email", limit=10, window=600, by="ip")),
+        Depends(RateLimit("resend_email", limit=3, window=600, by="user_id")),
+    ],
     responses={
         400: {"description": "Токен підтвердження електронної пошти протермінований"},
         405: {"description": "Метод заборонено"},
@@ -220,9 +239,14 @@ async def refresh_access(
 @router.post(
     "/forgot_password",
     status_code=status.HTTP_200_OK,
+    dependencies=[
+        Depends(RateLimit("forgot_password", limit=10, window=600, by="ip")),
+        Depends(RateLimit("forgot_password", limit=3, window=600, by="email")),
+    ],
     responses={
         404: {"description": "Користувача не знайдено"},
         405: {"description": "Метод заборонено"},
+        429: {"description": "Забагато запитів"},
         500: {"description": "Упс! Щось пішло не так. Спробуйте пізніше"},
     },
 )
@@ -7,11 +7,18 @@ from schemas.user_schema import (
     UserBaseSchema,
 )
 from api.v1.dependencies import (
+    get_admin_user,
     get_current_user,
+    get_loaders,
 )
+from utils.metrics import get_metrics
 
 
-router = APIRouter(prefix="/health", tags=["Health"])
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"],
+    dependencies=[Depends(get_loaders)],
+)
 
 
 current_user = Annotated[
@@ -25,3 +32,12 @@ async def health(
     user: current_user,
 ) -> str:
     return "OK"
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_admin_user)],
+)
+async def metrics() -> dict:
+    return get_metrics().snapshot()
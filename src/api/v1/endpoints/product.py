@@ -1,11 +1,15 @@
 from __future__ import annotations
 from typing import List, Optional
+from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy import select, func, and_, or_
 
-from database import get_db
+from database import get_db, get_read_db, read_session
+from api.v1.dependencies import get_loaders
+from repositories.product_repo import ProductRepository
+from utils.cache_aside import cached
 from schemas.product_schema import (
     FeatureSchema,
     ProductCardSchema, 
@@ -37,7 +41,11 @@ from models.product_model import (
     ProductSubscription
 )
 
-router = APIRouter(prefix="/product", tags=["Product"])
+router = APIRouter(
+    prefix="/product",
+    tags=["Product"],
+    dependencies=[Depends(get_loaders)],
+)
 
 @router.get("/products/{product_id}",
             responses={
@@ -119,6 +127,126 @@ async def get_product_category(product_id: int, category_id: int):
         raise HTTPException(500, detail="Упс! Щось пішло не так. Спробуйте пізніше")
 
 
+def _catalog_key(**params) -> str:
+    return "product_catalog:" + urlencode(
+        sorted((name, value) for name, value in params.items() if value is not None)
+    )
+
+
+@cached(_catalog_key, ttl=60, tags=["products"], lock=True)
+async def _product_catalog(
+    page: int,
+    per_page: int,
+    category: Optional[str],
+    brand: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    is_certified: Optional[bool],
+    in_stock: Optional[bool],
+    search: Optional[str],
+) -> dict:
+    filters = []
+
+    if category:
+        filters.append(Product.category.has(name=category))
+
+    if brand:
+        filters.append(Product.brand.has(name=brand))
+
+    if min_price is not None:
+        filters.append(Product.price >= min_price)
+
+    if max_price is not None:
+        filters.append(Product.price <= max_price)
+
+    if is_certified is not None:
+        filters.append(Product.is_certified == is_certified)
+
+    if in_stock is not None:
+        filters.append(Product.in_stock == in_stock)
+
+    if search:
+        filters.append(or_(
+            Product.name.ilike(f"%{search}%"),
+            Product.small_description.ilike(f"%{search}%")
+        ))
+
+    query = select(Product).options(
+        joinedload(Product.reviews),
+        joinedload(Product.features),
+        joinedload(Product.images),
+        joinedload(Product.category),
+        joinedload(Product.brand)
+    )
+    if filters:
+        query = query.where(and_(*filters))
+
+    count_query = select(func.count(Product.product_id))
+    if filters:
+        count_query = count_query.where(and_(*filters))
+
+    # Its own session: concurrent misses share this load (see SingleFlight).
+    async with read_session() as db:
+        total_result = await db.execute(count_query)
+        total_count = total_result.scalar()
+
+        if total_count == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="За заданими фільтрами товари не знайдено"
+            )
+
+        offset = (page - 1) * per_page
+        query = query.offset(offset).limit(per_page)
+
+        result = await db.execute(query)
+        products = result.unique().scalars().all()
+
+    product_cards = []
+    for p in products:
+        avg_rating = round(sum(r.rating for r in p.reviews) / len(p.reviews), 1) if p.reviews else 0.0
+        product_cards.append({
+            "product_id": p.product_id,
+            "name": p.name,
+            "price": float(p.price),
+            "currency": "UAH",
+            "average_rating": avg_rating,
+            "small_description": p.small_description,
+            "main_image_url": p.product_image,
+            "category_name": p.category.name if p.category else None,
+            "brand_name": p.brand.name if p.brand else None,
+            "is_certified": p.is_certified,
+            "in_stock": p.in_stock,
+
+        "features": [
+            {
+                "feature_id": f.feature_id,
+                "feature_name": f.feature_name,
+                "feature_text": f.feature_text,
+            }
+            for f in p.features
+        ],
+
+        "images": [
+            {
+                "image_url": i.image_url,
+                "image_description": i.image_description,
+            }
+            for i in p.images
+        ]
+        })
+
+    return {
+        "products": product_cards,
+        "page": page,
+        "per_page": per_page,
+        "total_count": total_count,
+        "total_pages": (total_count + per_page - 1) // per_page,
+        "has_next": page * per_page < total_count,
+        "has_prev": page > 1
+    }
+
+
 @router.get("/catalog",
             responses={
                 200: {"description": "Відповідь успішна"},
@@ -138,105 +266,19 @@ async def get_product_catalog(
     is_certified: Optional[bool] = None,
     in_stock: Optional[bool] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
 ):
     try:
-        filters = []
-
-        if category:
-            filters.append(Product.category.has(name=category))
-
-        if brand:
-            filters.append(Product.brand.has(name=brand))
-
-        if min_price is not None:
-            filters.append(Product.price >= min_price)
-
-        if max_price is not None:
-            filters.append(Product.price <= max_price)
-
-        if is_certified is not None:
-            filters.append(Product.is_certified == is_certified)
-
-        if in_stock is not None:
-            filters.append(Product.in_stock == in_stock)
-
-        if search:
-            filters.append(or_(
-                Product.name.ilike(f"%{search}%"),
-                Product.small_description.ilike(f"%{search}%")
-            ))
-
-        query = select(Product).options(
-            joinedload(Product.reviews),
-            joinedload(Product.features),
-            joinedload(Product.images)
+        return await _product_catalog(
+            page=page,
+            per_page=per_page,
+            category=category,
+            brand=brand,
+            min_price=min_price,
+            max_price=max_price,
+            is_certified=is_certified,
+            in_stock=in_stock,
+            search=search,
         )
-        if filters:
-            query = query.where(and_(*filters))
-
-        count_query = select(func.count(Product.product_id))
-        if filters:
-            count_query = count_query.where(and_(*filters))
-
-        total_result = await db.execute(count_query)
-        total_count = total_result.scalar()
-
-        if total_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="За заданими фільтрами товари не знайдено"
-            )
-
-        offset = (page - 1) * per_page
-        query = query.offset(offset).limit(per_page)
-
-        result = await db.execute(query)
-        products = result.scalars().all()
-
-        product_cards = []
-        for p in products:
-            avg_rating = round(sum(r.rating for r in p.reviews) / len(p.reviews), 1) if p.reviews else 0.0
-            product_cards.append({
-                "product_id": p.product_id,
-                "name": p.name,
-                "price": float(p.price),
-                "currency": "UAH",
-                "average_rating": avg_rating,
-                "small_description": p.small_description,
-                "main_image_url": p.image_url,
-                "category_name": p.category,
-                "brand_name": p.brand,
-                "is_certified": p.is_certified,
-                "in_stock": p.in_stock,
-
-            "features": [
-                {
-                    "feature_id": f.feature_id,
-                    "feature_name": f.feature_name,
-                    "feature_text": f.feature_text,
-                }
-                for f in p.features
-            ],
-
-            "images": [
-                {
-                    "image_url": i.image_url,
-                    "image_description": i.image_description,
-                }
-                for i in p.images
-            ]
-            })
-
-        return {
-            "products": product_cards,
-            "page": page,
-            "per_page": per_page,
-            "total_count": total_count,
-            "total_pages": (total_count + per_page - 1) // per_page,
-            "has_next": page * per_page < total_count,
-            "has_prev": page > 1
-        }
     
     except HTTPException:
         raise
@@ -259,7 +301,7 @@ async def get_product_catalog(
 async def get_search_suggestions(
     query: str = Query(..., min_length=2, description="Пошукова фраза"),
     limit: int = Query(10, ge=1, le=20, description="Максимальна кількість результатів"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     try:
         stmt = select(Product).where(
@@ -294,7 +336,6 @@ async def get_search_suggestions(
              )
 async def compare_products(
     product_id: list[int],
-    db: AsyncSession = Depends(get_db)
 ):
     try:
         if len(product_id) < 2:
@@ -303,14 +344,12 @@ async def compare_products(
         if len(product_id) > 5:
             raise HTTPException(400, detail="Максимум 5 товарів для порівняння")
         
-        stmt = select(Product).where(Product.product_id.in_(product_id))
-        result = await db.execute(stmt)
-        products = result.scalars().all()
+        products = await ProductRepository().get_for_comparison(product_id)
 
-        if len(products) != len(product_id):
+        if len(products) != len(set(product_id)):
             raise HTTPException(404, "Деякі товари не знайдено")
 
-        return [ProductComparisonSchema.from_orm(p) for p in products]
+        return [ProductComparisonSchema.model_validate(p) for p in products]
     
     except Exception:
         raise
@@ -351,6 +390,29 @@ async def subscribe(
         raise HTTPException(500, detail="Упс! Щось пішло не так. Спробуйте пізніше")
 
 
+@cached(
+    "product_detail:{product_id}",
+    tags=["product:{product_id}", "categories", "brands"],
+)
+async def _product_detail(product_id: int) -> Optional[dict]:
+    stmt = select(Product).options(
+        selectinload(Product.images),
+        selectinload(Product.reviews),
+        selectinload(Product.features),
+        selectinload(Product.variations),
+        selectinload(Product.traits),
+        joinedload(Product.category),
+        joinedload(Product.subcategory),
+        joinedload(Product.brand)
+    ).where(Product.product_id == product_id)
+
+    async with read_session() as db:
+        result = await db.execute(stmt)
+        product = result.scalar_one_or_none()
+        if product:
+            return ProductDetailSchema.model_validate(product).model_dump()
+
+
 @router.get("/{product_id}", response_model=ProductDetailSchema,
             responses={
                 200: {"description": "Детальна інформація про товар"},
@@ -358,22 +420,14 @@ async def subscribe(
                 500: {"description": "Упс! Щось пішло не так. Спробуйте пізніше"},
 }
 )
-async def get_product_detail(product_id: int, db: AsyncSession = Depends(get_db)):
+async def get_product_detail(product_id: int):
     try:
-        stmt = select(Product).options(
-            joinedload(Product.images),
-            joinedload(Product.reviews),
-            joinedload(Product.features),
-            joinedload(Product.variations)
-        ).where(Product.product_id == product_id)
-
-        result = await db.execute(stmt)
-        product = result.scalar_one_or_none()
+        product = await _product_detail(product_id=product_id)
 
         if not product:
             raise HTTPException(404, detail="Товар не знайдено")
 
-        return ProductDetailSchema.from_orm(product)
+        return product
     
     except Exception:
         raise
@@ -388,7 +442,7 @@ async def get_product_detail(product_id: int, db: AsyncSession = Depends(get_db)
                 404: {"description": "Товар не знайдено"},
                 500: {"description": "Упс! Щось пішло не так. Спробуйте пізніше"},
 })
-async def get_recommended(product_id: int, db: AsyncSession = Depends(get_db)):
+async def get_recommended(product_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
         product = await db.get(Product, product_id)
         if not product:
@@ -415,7 +469,7 @@ async def get_price_with_variations(
     product_id: int, 
     variation_type: Optional[str] = None,
     variation_value: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)):
+    db: AsyncSession = Depends(get_read_db)):
     try:
         stmt = select(ProductVariation).where(ProductVariation.product_id == product_id)
 
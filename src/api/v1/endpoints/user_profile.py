@@ -4,14 +4,18 @@ from fastapi import status, Depends, Request, Response, HTTPException
 from repositories.user_repo import UserRepository
 from services.user_service import UserService
 from schemas.user_schema import UserBaseSchema, UserUpdateSchema, UserChangePasswrdSchema
-from api.v1.dependencies import get_current_user, user_dep, get_load_service
+from api.v1.dependencies import get_current_user, user_dep, get_load_service, get_unit_of_work, get_loaders
 from fastapi import UploadFile, File
 from services.load_service import LoadService
 
 
 
 
-router = APIRouter(prefix="/profile", tags=["User Profile"])
+router = APIRouter(
+    prefix="/profile",
+    tags=["User Profile"],
+    dependencies=[Depends(get_loaders), Depends(get_unit_of_work)],
+)
 
 
 user_service_dep = Annotated[UserService, Depends(user_dep)]
@@ -109,9 +113,13 @@ async def update_user_password(
         dict: A success message indicating the password was updated.
     """
     
+    # The current user is cached without its password hash.
+    user = await user_service.user_repo.get(
+        id=current_user["id"], columns=["hash_password"]
+    )
     is_valid = await user_service.security_layer.verify_password(
         password=new_password.current_password,
-        hash_password=current_user["hash_password"]
+        hash_password=user["hash_password"]
     )
     if not is_valid:
         raise HTTPException(status_code=403, detail="Неправильний поточний пароль")
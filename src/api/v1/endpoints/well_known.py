@@ -0,0 +1,17 @@
+from fastapi.routing import APIRouter
+from fastapi import status, Response
+
+from core.tokens import get_token_codec
+
+
+router = APIRouter(
+    prefix="/.well-known",
+    tags=["Well-known"],
+)
+
+
+@router.get("/jwks.json", status_code=status.HTTP_200_OK)
+async def jwks(response: Response) -> dict:
+    # Verifiers may cache the key set; it changes only with a key rotation.
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return get_token_codec().jwks()
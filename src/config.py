@@ -13,6 +13,9 @@ from pydantic_settings import (
 
 class ConfigSettings(BaseSettings):
     PROJECT_NAME: str
+    DEBUG: bool = Field(default=False)
+    LOG_LEVEL: str = Field(default="INFO")
+    LOG_FORMAT: str = Field(default="text")
 
     POSTGRES_DB: str
     POSTGRES_USER: str
@@ -22,6 +25,56 @@ class ConfigSettings(BaseSettings):
 
     DB_URI: Optional[str] = Field(default=None)
 
+    DB_POOL_SIZE: int = Field(default=5)
+    DB_MAX_OVERFLOW: int = Field(default=10)
+    DB_POOL_TIMEOUT: float = Field(default=30)
+    DB_POOL_RECYCLE: int = Field(default=1800)
+    DB_POOL_PRE_PING: bool = Field(default=True)
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100)
+
+    DB_SLOW_QUERY_MS: float = Field(default=200)
+
+    # Comma-separated read-replica DSNs; reads stay on the primary when empty.
+    DB_REPLICA_URIS: Optional[str] = Field(default=None)
+    DB_REPLICA_STRATEGY: str = Field(default="round_robin")
+
+    @field_validator("DB_REPLICA_STRATEGY")
+    @classmethod
+    def check_replica_strategy(cls, value: str) -> str:
+        if value not in ("round_robin", "least_connections"):
+            raise ValueError(
+                "DB_REPLICA_STRATEGY must be round_robin or least_connections"
+            )
+        return value
+
+    @field_validator("CACHE_BACKEND")
+    @classmethod
+    def check_cache_backend(cls, value: str) -> str:
+        if value not in ("redis", "memory"):
+            raise ValueError("CACHE_BACKEND must be redis or memory")
+        return value
+
+    @field_validator("CACHE_SERIALIZER")
+    @classmethod
+    def check_cache_serializer(cls, value: str) -> str:
+        if value not in ("json", "msgpack"):
+            raise ValueError("CACHE_SERIALIZER must be json or msgpack")
+        return value
+
+    @field_validator("REFRESH_TOKEN_STORE")
+    @classmethod
+    def check_refresh_token_store(cls, value: str) -> str:
+        if value not in ("postgres", "redis"):
+            raise ValueError("REFRESH_TOKEN_STORE must be postgres or redis")
+        return value
+
+    @field_validator("PASSWORD_HASH_SCHEME")
+    @classmethod
+    def check_password_hash_scheme(cls, value: str) -> str:
+        if value not in ("bcrypt", "argon2"):
+            raise ValueError("PASSWORD_HASH_SCHEME must be bcrypt or argon2")
+        return value
+
     @model_validator(mode="after")
     def generate_db_uri(self):
         if not self.DB_URI:
@@ -33,11 +86,56 @@ class ConfigSettings(BaseSettings):
 
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_MAX_CONNECTIONS: int = Field(default=50)
+    REDIS_SOCKET_TIMEOUT: float = Field(default=5)
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = Field(default=5)
+    CACHE_BACKEND: str = Field(default="redis")
+    CACHE_MEMORY_MAX_SIZE: int = Field(default=100000)
+    CACHE_ENABLED: bool = Field(default=True)
+    CACHE_DEFAULT_TTL: int = Field(default=300)
+    CACHE_TAG_TTL: int = Field(default=86400)
+    CACHE_LOCK_ENABLED: bool = Field(default=False)
+    CACHE_LOCK_TTL: int = Field(default=10)
+    CACHE_LOCK_POLL_INTERVAL: float = Field(default=0.05)
+    CACHE_XFETCH_BETA: float = Field(default=1.0)
+    CACHE_L1_ENABLED: bool = Field(default=False)
+    CACHE_L1_MAX_SIZE: int = Field(default=10000)
+    CACHE_L1_TTL: float = Field(default=30)
+    CACHE_L1_INVALIDATION_CHANNEL: str = Field(default="cache:invalidate")
+    CACHE_SERIALIZER: str = Field(default="msgpack")
+    CACHE_COMPRESS_THRESHOLD: Optional[int] = Field(default=1024)
+    CACHE_COMPRESS_LEVEL: int = Field(default=1)
 
     SECRET_KEY: str
     ALGORITHM: str
+    # PEM private key for ES256/EdDSA; its public half is served as JWKS.
+    JWT_PRIVATE_KEY_FILE: Optional[str] = Field(default=None)
+    JWT_KEY_ID: Optional[str] = Field(default=None)
+    JWT_LEEWAY: float = Field(default=10)
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
+    REFRESH_TOKEN_STORE: str = Field(default="postgres")
+    TOKEN_JANITOR_ENABLED: bool = Field(default=True)
+    TOKEN_JANITOR_INTERVAL: float = Field(default=3600)
+    TOKEN_JANITOR_BATCH_SIZE: int = Field(default=1000)
+    TOKEN_JANITOR_MAX_ROWS_PER_SECOND: float = Field(default=5000)
+    RATE_LIMIT_ENABLED: bool = Field(default=True)
+    # Set by nginx from $remote_addr; empty to use the connecting peer.
+    RATE_LIMIT_IP_HEADER: Optional[str] = Field(default="X-Real-IP")
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = Field(default=100000)
+    PASSWORD_HASH_WORKERS: int = Field(default=4)
+    PASSWORD_HASH_QUEUE_SIZE: int = Field(default=64)
+    # Existing hashes with another scheme or cost are rehashed on login.
+    PASSWORD_HASH_SCHEME: str = Field(default="bcrypt")
+    PASSWORD_BCRYPT_ROUNDS: int = Field(default=12)
+    PASSWORD_ARGON2_MEMORY_COST: int = Field(default=65536)
+    PASSWORD_ARGON2_TIME_COST: int = Field(default=3)
+    PASSWORD_ARGON2_PARALLELISM: int = Field(default=1)
+    AUTH_TOKEN_CACHE_SIZE: int = Field(default=10000)
+    AUTH_TOKEN_CACHE_TTL: float = Field(default=300)
+    AUTH_USER_CACHE_TTL: int = Field(default=60)
+    # Users with this role may read /health/metrics.
+    ADMIN_ROLE_ID: int = Field(default=1)
 
     SENDER: str
     CHARSET: str
@@ -0,0 +1,75 @@
+import boto3
+from fastapi import HTTPException
+
+from config import config_setting
+from core.security import JWTAuth, close_password_hasher, get_password_hasher
+from repositories.token_repo import RedisTokenRepository
+from repositories.user_repo import TokenRepository, UserRepository
+from services.auth_service import AuthService
+from services.load_service import LoadService
+from services.token_janitor import get_token_janitor
+from services.user_service import UserService
+from utils.cache_manager import close_cache_manager, close_redis_pool, get_cache_manager
+from utils.email_manager import MetaUaSender
+from utils.rate_limiter import close_rate_limiter
+from utils.template_render import get_template
+
+
+class Container:
+    """
+    Clients and services shared by every request: built once when the
+    application starts and closed when it shuts down. The services keep no
+    per-request state, so dependencies hand out these instances as they are.
+    """
+
+    def __init__(self) -> None:
+        self.cache_manager = get_cache_manager()
+        self.password_hasher = get_password_hasher()
+        self.s3 = boto3.client(
+            "s3",
+            aws_access_key_id=config_setting.ACCESS_KEY,
+            aws_secret_access_key=config_setting.SECRET_ACCESS_KEY,
+            region_name=config_setting.AWS_REGION,
+        )
+
+        # AuthService instantiates what it is given, once, here.
+        self.auth_service = AuthService(
+            user_repo=UserRepository,
+            refresh_repo=(
+                RedisTokenRepository
+                if config_setting.REFRESH_TOKEN_STORE == "redis"
+                else TokenRepository
+            ),
+            cache_manager=get_cache_manager,
+            email_manager=MetaUaSender,
+            security_layer=JWTAuth,
+            error_handler=HTTPException,
+            template_handler=get_template,
+        )
+        self.user_service = UserService(
+            user_repo=self.auth_service.user_repo,
+            error_handler=HTTPException,
+            token_repo=self.auth_service.refresh_repo,
+            security_layer=self.auth_service.security_layer,
+        )
+        self.load_service = LoadService(s3=self.s3)
+        # Redis-stored tokens expire on their own.
+        self.token_janitor = (
+            get_token_janitor()
+            if config_setting.TOKEN_JANITOR_ENABLED
+            and config_setting.REFRESH_TOKEN_STORE == "postgres"
+            else None
+        )
+
+    async def start(self) -> None:
+        await self.cache_manager.start()
+        if self.token_janitor is not None:
+            await self.token_janitor.start()
+
+    async def close(self) -> None:
+        if self.token_janitor is not None:
+            await self.token_janitor.close()
+        await close_cache_manager()
+        await close_redis_pool()
+        close_password_hasher()
+        close_rate_limiter()
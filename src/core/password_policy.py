@@ -0,0 +1,141 @@
+"""
+Password hashing policy. New hashes use PASSWORD_HASH_SCHEME with the
+configured cost; hashes made with another scheme or cost still verify and
+are reported as needing an update, so they are rehashed on the next login.
+
+To pick a cost for this machine, aiming for about --target-ms per hash:
+
+    cd src && python -m core.password_policy bcrypt --target-ms 250
+    cd src && python -m core.password_policy argon2 --target-ms 250 --memory-kib 65536
+"""
+
+import argparse
+import statistics
+import time
+
+from passlib.context import CryptContext
+from passlib.hash import argon2
+
+from config import config_setting
+
+
+SCHEMES = ("bcrypt", "argon2")
+
+
+def build_crypt_context(
+    scheme: str,
+    bcrypt_rounds: int,
+    argon2_memory_cost: int,
+    argon2_time_cost: int,
+    argon2_parallelism: int,
+) -> CryptContext:
+    schemes = [scheme] + [other for other in SCHEMES if other != scheme]
+    # Keep verifying argon2 hashes after switching back to bcrypt, as long as
+    # argon2-cffi is installed.
+    if scheme != "argon2" and not argon2.has_backend():
+        schemes.remove("argon2")
+    settings = {
+        # Desired rounds pinned to the configured value: hashes with a higher
+        # or lower cost need an update too.
+        "bcrypt__rounds": bcrypt_rounds,
+        "bcrypt__min_desired_rounds": bcrypt_rounds,
+        "bcrypt__max_desired_rounds": bcrypt_rounds,
+    }
+    if "argon2" in schemes:
+        settings.update(
+            argon2__type="ID",
+            argon2__memory_cost=argon2_memory_cost,
+            argon2__rounds=argon2_time_cost,
+            argon2__min_desired_rounds=argon2_time_cost,
+            argon2__max_desired_rounds=argon2_time_cost,
+            argon2__parallelism=argon2_parallelism,
+        )
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
+
+
+def get_crypt_context() -> CryptContext:
+    return build_crypt_context(
+        scheme=config_setting.PASSWORD_HASH_SCHEME,
+        bcrypt_rounds=config_setting.PASSWORD_BCRYPT_ROUNDS,
+        argon2_memory_cost=config_setting.PASSWORD_ARGON2_MEMORY_COST,
+        argon2_time_cost=config_setting.PASSWORD_ARGON2_TIME_COST,
+        argon2_parallelism=config_setting.PASSWORD_ARGON2_PARALLELISM,
+    )
+
+
+def measure(context: CryptContext, samples: int) -> float:
+    """Median seconds per hash."""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target: float, samples: int) -> dict:
+    # Every extra round doubles the cost; take the last one under target.
+    best = {"PASSWORD_BCRYPT_ROUNDS": 4}
+    for rounds in range(4, 32):
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        seconds = measure(context, samples)
+        print(f"  bcrypt rounds={rounds:<2} {seconds * 1000:8.1f} ms")
+        if seconds > target:
+            break
+        best = {"PASSWORD_BCRYPT_ROUNDS": rounds}
+    return best
+
+
+def calibrate_argon2(
+    target: float, samples: int, memory_cost: int, parallelism: int
+) -> dict:
+    # Memory is the main defence, so keep it and raise time_cost; halve the
+    # memory only if a single pass is already too slow.
+    while True:
+        best = None
+        for time_cost in range(1, 64):
+            context = CryptContext(
+                schemes=["argon2"],
+                argon2__type="ID",
+                argon2__memory_cost=memory_cost,
+                argon2__rounds=time_cost,
+                argon2__parallelism=parallelism,
+            )
+            seconds = measure(context, samples)
+            print(
+                f"  argon2id m={memory_cost} t={time_cost:<2} p={parallelism} "
+                f"{seconds * 1000:8.1f} ms"
+            )
+            if seconds > target:
+                break
+            best = {
+                "PASSWORD_ARGON2_MEMORY_COST": memory_cost,
+                "PASSWORD_ARGON2_TIME_COST": time_cost,
+                "PASSWORD_ARGON2_PARALLELISM": parallelism,
+            }
+        if best is not None or memory_cost <= 8 * parallelism:
+            return best or {}
+        memory_cost //= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("scheme", choices=SCHEMES)
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--memory-kib", type=int, default=65536)
+    parser.add_argument("--parallelism", type=int, default=1)
+    args = parser.parse_args()
+
+    target = args.target_ms / 1000
+    if args.scheme == "bcrypt":
+        settings = calibrate_bcrypt(target, args.samples)
+    else:
+        settings = calibrate_argon2(
+            target, args.samples, args.memory_kib, args.parallelism
+        )
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    for name, value in settings.items():
+        print(f"{name}={value}")
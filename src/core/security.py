@@ -1,33 +1,128 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime, timezone
-from passlib.context import CryptContext
-import jwt
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
 from config import config_setting
+from core.password_policy import get_crypt_context
+from core.tokens import TokenCodec, get_token_codec
+from utils.metrics import get_metrics
+from utils.tiered_cache import LRUCache
+
+
+class PasswordHasherBusy(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=503,
+            detail="Сервер перевантажений. Спробуйте пізніше",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification on a dedicated thread pool so the
+    event loop keeps serving other requests; bcrypt releases the GIL, so the
+    workers hash on separate cores. Once ``workers + queue_size`` calls are in
+    flight further ones are shed with a 503 instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.workers = workers
+        self.limit = workers + queue_size
+        self.in_flight = 0
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hasher"
+        )
+        get_metrics().gauge("password_hash_in_flight", lambda: self.in_flight)
+        get_metrics().gauge(
+            "password_hash_queue_depth", lambda: max(0, self.in_flight - workers)
+        )
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.limit:
+            get_metrics().incr("password_hash_rejected")
+            raise PasswordHasherBusy()
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, fn, *args
+            )
+        finally:
+            self.in_flight -= 1
+            get_metrics().observe("password_hash", time.perf_counter() - start)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(
+            workers=config_setting.PASSWORD_HASH_WORKERS,
+            queue_size=config_setting.PASSWORD_HASH_QUEUE_SIZE,
+        )
+    return _password_hasher
+
+
+def close_password_hasher() -> None:
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
 
 
 class SecurityBase:
     def __init__(self):
-        self.pwd_context = CryptContext(
-            schemes=["bcrypt"],
-            deprecated="auto",
-        )
+        self.pwd_context = get_crypt_context()
 
     async def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+        return await get_password_hasher().run(self.pwd_context.hash, password)
 
     async def verify_password(
         self,
         password: str,
         hash_password: str,
     ) -> bool:
-        return self.pwd_context.verify(password, hash_password)
+        return await get_password_hasher().run(
+            self.pwd_context.verify, password, hash_password
+        )
 
+    async def verify_and_update(
+        self,
+        password: str,
+        hash_password: str,
+    ) -> tuple[bool, Optional[str]]:
+        """Verify; also return a new hash if the stored one is out of policy."""
+        return await get_password_hasher().run(
+            self.pwd_context.verify_and_update, password, hash_password
+        )
 
-class JWTAuth(SecurityBase):
-    SECRET_KEY = config_setting.SECRET_KEY
-    ALGORITHM = config_setting.ALGORITHM
 
+class JWTAuth(SecurityBase):
     def __init__(self):
         super().__init__()
+        # Verified claims by token digest; a token's claims never change, so
+        # entries only need to expire with the token itself.
+        self.claims_cache = LRUCache(
+            max_size=config_setting.AUTH_TOKEN_CACHE_SIZE,
+            ttl=config_setting.AUTH_TOKEN_CACHE_TTL,
+            name="auth_token_cache",
+        )
+
+    @property
+    def codec(self) -> TokenCodec:
+        # Built on first use, so a bad JWT setting fails signing and
+        # verification rather than every JWTAuth() construction.
+        return get_token_codec()
 
     async def create_access_token(self, data: dict) -> str:
         try:
@@ -36,11 +131,7 @@ class JWTAuth(SecurityBase):
                 minutes=config_setting.ACCESS_TOKEN_EXPIRE_MINUTES
             )
             to_encode.update({"exp": expire})
-            encoded_jwt = jwt.encode(
-                to_encode,
-                self.SECRET_KEY,
-                algorithm=self.ALGORITHM,
-            )
+            encoded_jwt = self.codec.encode(to_encode)
             return encoded_jwt
         except Exception as e:
             raise Exception(
@@ -53,12 +144,10 @@ class JWTAuth(SecurityBase):
             expire = datetime.now(timezone.utc) + timedelta(
                 days=config_setting.REFRESH_TOKEN_EXPIRE_DAYS
             )
-            to_encode.update({"exp": expire})
-            encoded_jwt = jwt.encode(
-                to_encode,
-                self.SECRET_KEY,
-                algorithm=self.ALGORITHM,
-            )
+            # jti keeps two tokens issued in the same second distinct and is
+            # what the token store keys on.
+            to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+            encoded_jwt = self.codec.encode(to_encode)
             return (
                 encoded_jwt,
                 expire.replace(tzinfo=None),
@@ -69,12 +158,13 @@ class JWTAuth(SecurityBase):
             )
 
     async def decode_token(self, token: str) -> dict:
-        try:
-            payload = jwt.decode(
-                token,
-                self.SECRET_KEY,
-                algorithms=self.ALGORITHM,
-            )
-            return payload
-        except Exception as e:
-            raise ValueError(f"Decode Token Error in {self.decode_token.__name__}: {e}")
+        key = hashlib.sha256(token.encode()).hexdigest()
+        payload = self.claims_cache.get(key)
+        if payload is not None:
+            return dict(payload)
+        # Raises TokenExpired/TokenInvalid, both ValueErrors.
+        payload = self.codec.decode(token)
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            self.claims_cache.set(key, dict(payload), ttl=ttl)
+        return payload
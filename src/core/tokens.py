@@ -0,0 +1,170 @@
+"""
+JWT signing and verification with keys parsed once at startup.
+
+HS* tokens are signed with SECRET_KEY. ES256 and EdDSA tokens are signed
+with the PEM private key in JWT_PRIVATE_KEY_FILE and carry a ``kid``; the
+matching public key is published as a JWKS document so other services can
+verify them without calling us. To create a key and print its JWKS:
+
+    cd src && python -m core.tokens generate EdDSA > jwt_key.pem
+    cd src && python -m core.tokens jwks jwt_key.pem EdDSA
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+
+from config import config_setting
+
+
+SYMMETRIC_ALGORITHMS = ("HS256", "HS384", "HS512")
+ASYMMETRIC_ALGORITHMS = ("ES256", "EdDSA")
+
+# Members of each key type that identify it (RFC 7638).
+THUMBPRINT_MEMBERS = {"EC": ("crv", "kty", "x", "y"), "OKP": ("crv", "kty", "x")}
+
+
+class TokenError(ValueError):
+    pass
+
+
+class TokenExpired(TokenError):
+    pass
+
+
+class TokenInvalid(TokenError):
+    pass
+
+
+def jwk_thumbprint(jwk: dict) -> str:
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(
+        json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+class TokenCodec:
+    """
+    Encodes and decodes tokens for one algorithm. Keys are prepared once
+    here; PyJWT would otherwise re-parse a PEM key on every call. Decoding
+    accepts ``leeway`` seconds of clock skew and requires ``exp``.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: Optional[str] = None,
+        private_key: Optional[bytes] = None,
+        key_id: Optional[str] = None,
+        leeway: float = 0,
+    ) -> None:
+        if algorithm not in SYMMETRIC_ALGORITHMS + ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.algorithms = [algorithm]
+        self.leeway = leeway
+        self.public_jwk: Optional[dict] = None
+
+        alg = get_default_algorithms().get(algorithm)
+        if alg is None:
+            raise ValueError(f"{algorithm} needs the cryptography package")
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            if not secret:
+                raise ValueError(f"{algorithm} needs SECRET_KEY")
+            self.signing_key = self.verify_key = alg.prepare_key(secret)
+            self.key_id = key_id
+        else:
+            if not private_key:
+                raise ValueError(f"{algorithm} needs JWT_PRIVATE_KEY_FILE")
+            self.signing_key = alg.prepare_key(private_key)
+            self.verify_key = self.signing_key.public_key()
+            jwk = alg.to_jwk(self.verify_key, as_dict=True)
+            self.key_id = key_id or jwk_thumbprint(jwk)
+            self.public_jwk = {
+                **jwk,
+                "kid": self.key_id,
+                "use": "sig",
+                "alg": algorithm,
+            }
+        self.headers = {"kid": self.key_id} if self.key_id else None
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(
+            claims, self.signing_key, algorithm=self.algorithm, headers=self.headers
+        )
+
+    def decode(self, token: str) -> dict:
+        try:
+            return jwt.decode(
+                token,
+                self.verify_key,
+                algorithms=self.algorithms,
+                leeway=self.leeway,
+                options={"require": ["exp"]},
+            )
+        except jwt.ExpiredSignatureError as e:
+            raise TokenExpired(str(e)) from e
+        except jwt.PyJWTError as e:
+            raise TokenInvalid(str(e)) from e
+
+    def jwks(self) -> dict[str, Any]:
+        # Symmetric secrets are never published.
+        return {"keys": [self.public_jwk] if self.public_jwk else []}
+
+
+_token_codec: Optional[TokenCodec] = None
+
+
+def get_token_codec() -> TokenCodec:
+    global _token_codec
+    if _token_codec is None:
+        key_file = config_setting.JWT_PRIVATE_KEY_FILE
+        _token_codec = TokenCodec(
+            algorithm=config_setting.ALGORITHM,
+            secret=config_setting.SECRET_KEY,
+            private_key=Path(key_file).read_bytes() if key_file else None,
+            key_id=config_setting.JWT_KEY_ID,
+            leeway=config_setting.JWT_LEEWAY,
+        )
+    return _token_codec
+
+
+def generate_private_key(algorithm: str) -> bytes:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if algorithm == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"No key pair for {algorithm}")
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="print a new PEM private key")
+    generate.add_argument("algorithm", choices=ASYMMETRIC_ALGORITHMS)
+    show = commands.add_parser("jwks", help="print the JWKS for a private key")
+    show.add_argument("key_file")
+    show.add_argument("algorithm", choices=ASYMMETRIC_ALGORITHMS)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        print(generate_private_key(args.algorithm).decode(), end="")
+    else:
+        codec = TokenCodec(args.algorithm, private_key=Path(args.key_file).read_bytes())
+        print(json.dumps(codec.jwks(), indent=2))
@@ -1,17 +1,134 @@
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from config import config_setting
+from utils.metrics import get_metrics
+from utils.query_stats import instrument_engine
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            get_metrics().observe("db_pool_checkout_wait", time.perf_counter() - start)
+
+
+def engine_options(uri: str) -> dict:
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config_setting.DB_POOL_SIZE,
+        "max_overflow": config_setting.DB_MAX_OVERFLOW,
+        "pool_timeout": config_setting.DB_POOL_TIMEOUT,
+        "pool_recycle": config_setting.DB_POOL_RECYCLE,
+        "pool_pre_ping": config_setting.DB_POOL_PRE_PING,
+    }
+    if uri.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "prepared_statement_cache_size": config_setting.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+def register_pool_metrics(engine, prefix: str = "db_pool") -> None:
+    # engine.dispose() swaps the pool, so read it at snapshot time.
+    get_metrics().gauge(f"{prefix}_in_use", lambda: engine.pool.checkedout())
+    get_metrics().gauge(f"{prefix}_idle", lambda: engine.pool.checkedin())
+    get_metrics().gauge(f"{prefix}_overflow", lambda: engine.pool.overflow())
+    get_metrics().gauge(f"{prefix}_size", lambda: engine.pool.size())
 
 
-engine = create_async_engine(config_setting.DB_URI)
+engine = create_async_engine(
+    config_setting.DB_URI, **engine_options(config_setting.DB_URI)
+)
+register_pool_metrics(engine)
+instrument_engine(engine)
 async_session_maker = async_sessionmaker(
     engine,
     expire_on_commit=False,
     class_=AsyncSession,
 )
 
+replica_engines = []
+for index, uri in enumerate(
+    u.strip() for u in (config_setting.DB_REPLICA_URIS or "").split(",") if u.strip()
+):
+    replica_engines.append(create_async_engine(uri, **engine_options(uri)))
+    register_pool_metrics(replica_engines[-1], prefix=f"db_replica{index}_pool")
+    instrument_engine(replica_engines[-1])
+_replica_cycle = itertools.cycle(replica_engines)
+
+# Unbound factory; read sessions are bound to the engine picked per session.
+read_session_maker = async_sessionmaker(
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
+# Set once the current request has written, so its later reads see the write.
+primary_pinned: ContextVar[bool] = ContextVar("primary_pinned", default=False)
+
 Base = declarative_base()
 
+
+def get_read_engine():
+    if not replica_engines or primary_pinned.get():
+        return engine
+    if config_setting.DB_REPLICA_STRATEGY == "least_connections":
+        return min(replica_engines, key=lambda e: e.pool.checkedout())
+    return next(_replica_cycle)
+
+
+def read_session() -> AsyncSession:
+    return read_session_maker(bind=get_read_engine())
+
+
+# Session shared by every repository call made inside ``unit_of_work()``.
+current_session: ContextVar[Optional[AsyncSession]] = ContextVar(
+    "current_session", default=None
+)
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[AsyncSession]:
+    """
+    Open one session/transaction for the enclosed block. Repositories join it
+    instead of opening their own; it is committed once on a clean exit and
+    rolled back if the block raises. Nested calls reuse the outer unit.
+    Callbacks in ``session.info["after_commit"]`` are awaited after the commit.
+    """
+    session = current_session.get()
+    if session is not None:
+        yield session
+        return
+
+    async with async_session_maker() as session:
+        token = current_session.set(session)
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        finally:
+            current_session.reset(token)
+        for callback in session.info.pop("after_commit", []):
+            await callback()
+
+
 async def get_db() -> AsyncSession:
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_read_db() -> AsyncSession:
+    async with read_session() as session:
+        yield session
@@ -1,19 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import engine, Base
+from database import engine, replica_engines, Base
 from api.routers import routers as api_routers
+from core.container import Container
+from utils.query_stats import query_stats_middleware
 
 
 def get_application() -> FastAPI:
 
-    async def startup():
+    @asynccontextmanager
+    async def lifespan(application: FastAPI):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+        container = application.state.container = Container()
+        await container.start()
+        try:
+            yield
+        finally:
+            await container.close()
+            for db_engine in (engine, *replica_engines):
+                await db_engine.dispose()
 
-    application = FastAPI()
-
-    application.add_event_handler("startup", startup)
+    application = FastAPI(lifespan=lifespan)
 
     origins = [
         "https://nuviora.vercel.app",
@@ -29,6 +40,8 @@ def get_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    application.middleware("http")(query_stats_middleware)
+
     for router in api_routers:
         application.include_router(router=router)
 
@@ -102,7 +102,6 @@ class Product(Base):
             "name": self.name,
             "description": self.description,
             "small_description": self.small_description,
-            "traits_id": self.traits_id,
             "price": self.price,
             "availability": self.availability,
             "currency": self.currency,
@@ -115,7 +115,7 @@ class TokenModel(Base):
     )
 
     refresh_token: Mapped[str] = mapped_column(unique=True)
-    expires_at: Mapped[datetime] = mapped_column()
+    expires_at: Mapped[datetime] = mapped_column(index=True)
     user_agent: Mapped[str] = mapped_column()
     created_at: Mapped[datetime] = mapped_column(default=datetime.now())
 
@@ -0,0 +1,88 @@
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from utils.repository import SqlLayer
+from models.product_model import (
+    Category,
+    Subcategory,
+    Brand,
+    Product,
+    ProductImage,
+    Feature,
+    ProductVariation,
+    Review,
+)
+
+
+class CategoryRepository(SqlLayer):
+    model = Category
+    cache_tags = ("products", "categories")
+
+
+class SubcategoryRepository(SqlLayer):
+    model = Subcategory
+    cache_tags = ("products", "categories")
+
+
+class BrandRepository(SqlLayer):
+    model = Brand
+    cache_tags = ("products", "brands")
+
+
+class ProductRepository(SqlLayer):
+    model = Product
+    cache_tags = ("product:{product_id}", "products")
+
+    async def get_for_comparison(self, product_ids: Iterable[int]) -> list[dict]:
+        """Products with their brand, main image, features and average rating."""
+        stmt = (
+            select(Product)
+            .where(Product.product_id.in_(list(product_ids)))
+            .options(
+                joinedload(Product.brand),
+                selectinload(Product.features),
+                selectinload(Product.reviews),
+            )
+        )
+        async with self._session(read_only=True) as session:
+            try:
+                products = (await session.execute(stmt)).scalars().all()
+                return [
+                    {
+                        "product_id": p.product_id,
+                        "name": p.name,
+                        "price": float(p.price),
+                        "currency": p.currency or "UAH",
+                        "brand_name": p.brand.name if p.brand else None,
+                        "image_url": p.product_image,
+                        "features": [await f.to_dict() for f in p.features],
+                        "average_rating": round(p.average_rating, 1),
+                    }
+                    for p in products
+                ]
+            except Exception as e:
+                raise Exception(
+                    f"Comparison Error in {self.model.__class__.__name__}: {e}"
+                )
+
+
+class ProductImageRepository(SqlLayer):
+    model = ProductImage
+    cache_tags = ("product:{product_id}", "products")
+
+
+class FeatureRepository(SqlLayer):
+    model = Feature
+    cache_tags = ("product:{product_id}", "products")
+
+
+class ProductVariationRepository(SqlLayer):
+    model = ProductVariation
+    cache_tags = ("product:{product_id}", "products")
+
+
+class ReviewRepository(SqlLayer):
+    model = Review
+    cache_tags = ("product:{product_id}", "products")
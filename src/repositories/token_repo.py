@@ -0,0 +1,187 @@
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import jwt
+from redis.asyncio import Redis
+
+from utils.cache_manager import get_redis_pool
+
+
+# Drops token KEYS[1] (id ARGV[2]) and its entry in its owner's index
+# KEYS[2], in one step, if it still belongs to user ARGV[1]. Only one of
+# several concurrent calls for a token gets 1.
+REVOKE_ONE = """
+if redis.call('HGET', KEYS[1], 'user_id') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[2])
+return 1
+"""
+
+# Drops tokens KEYS[2..] and their ids ARGV[1..] from the user's index
+# KEYS[1]; returns how many tokens were still there.
+REVOKE_ALL = """
+local revoked = 0
+for i = 2, #KEYS do
+    revoked = revoked + redis.call('DEL', KEYS[i])
+    redis.call('ZREM', KEYS[1], ARGV[i - 1])
+end
+return revoked
+"""
+
+
+class RedisTokenRepository:
+    """
+    Refresh tokens in Redis, with the same insert/get/get_all/delete calls
+    as TokenRepository. Each token is a hash under the SHA-256 of its
+    ``jti`` that expires with the token; a sorted set per user, scored by
+    expiry, lists them for "log out everywhere". The token string itself is
+    never stored.
+    """
+
+    token_prefix = "refresh_token:"
+    user_prefix = "refresh_tokens:"
+
+    def __init__(self) -> None:
+        self.redis = Redis(connection_pool=get_redis_pool())
+        self._revoke_one = self.redis.register_script(REVOKE_ONE)
+        self._revoke_all = self.redis.register_script(REVOKE_ALL)
+
+    @staticmethod
+    def _token_id(refresh_token: str) -> str:
+        try:
+            claims = jwt.decode(refresh_token, options={"verify_signature": False})
+        except jwt.PyJWTError:
+            claims = {}
+        # Tokens issued before jti was added are keyed by the whole string.
+        return hashlib.sha256(
+            str(claims.get("jti") or refresh_token).encode()
+        ).hexdigest()
+
+    def _token_key(self, token_id: str) -> str:
+        return f"{self.token_prefix}{token_id}"
+
+    def _user_key(self, user_id: Any) -> str:
+        return f"{self.user_prefix}{user_id}"
+
+    def _lookup(self, kwargs: dict) -> Optional[str]:
+        if kwargs.get("refresh_token") is not None:
+            return self._token_id(kwargs["refresh_token"])
+        return kwargs.get("id")
+
+    @staticmethod
+    def _record(token_id: str, fields: dict) -> Optional[dict]:
+        if not fields:
+            return None
+        fields = {key.decode(): value.decode() for key, value in fields.items()}
+        return {
+            "id": token_id,
+            "user_id": uuid.UUID(fields["user_id"]),
+            "user_agent": fields.get("user_agent") or None,
+            "expires_at": datetime.fromisoformat(fields["expires_at"]),
+            "created_at": datetime.fromisoformat(fields["created_at"]),
+        }
+
+    async def insert(self, data: dict) -> dict:
+        try:
+            token_id = self._token_id(data["refresh_token"])
+            # expires_at is naive UTC, as create_refresh_token returns it.
+            expires_at = data["expires_at"]
+            expire_ts = int(expires_at.replace(tzinfo=timezone.utc).timestamp())
+            created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            token_key = self._token_key(token_id)
+            user_key = self._user_key(data["user_id"])
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(
+                    token_key,
+                    mapping={
+                        "user_id": str(data["user_id"]),
+                        "user_agent": data.get("user_agent") or "",
+                        "expires_at": expires_at.isoformat(),
+                        "created_at": created_at.isoformat(),
+                    },
+                )
+                pipe.expireat(token_key, expire_ts)
+                pipe.zadd(user_key, {token_id: expire_ts})
+                pipe.zremrangebyscore(user_key, "-inf", time.time())
+                # Refresh tokens share one lifetime, so the newest expires last.
+                pipe.expireat(user_key, expire_ts)
+                await pipe.execute()
+
+            return {
+                "id": token_id,
+                "user_id": data["user_id"],
+                "refresh_token": data["refresh_token"],
+                "user_agent": data.get("user_agent"),
+                "expires_at": expires_at,
+                "created_at": created_at,
+            }
+        except Exception as e:
+            raise Exception(f"Insert Error in {self.__class__.__name__}: {e}")
+
+    async def get(self, *args: Any, **kwargs: Any) -> dict:
+        try:
+            token_id = self._lookup(kwargs)
+            if token_id is None:
+                raise ValueError("refresh_token or id is required")
+            fields = await self.redis.hgetall(self._token_key(token_id))
+            return self._record(token_id, fields) or False
+        except Exception as e:
+            raise Exception(f"Get Error in {self.__class__.__name__}: {e}")
+
+    async def get_all(self, *args: Any, **kwargs: Any) -> list[dict]:
+        try:
+            user_id = kwargs["user_id"]
+            token_ids = await self.redis.zrangebyscore(
+                self._user_key(user_id), time.time(), "+inf"
+            )
+            token_ids = [token_id.decode() for token_id in token_ids]
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for token_id in token_ids:
+                    pipe.hgetall(self._token_key(token_id))
+                rows = await pipe.execute()
+            records = (
+                self._record(token_id, fields)
+                for token_id, fields in zip(token_ids, rows)
+            )
+            return [record for record in records if record]
+        except Exception as e:
+            raise Exception(f"Get All Error in {self.__class__.__name__}: {e}")
+
+    async def delete(self, *args: Any, **kwargs: Any) -> bool:
+        try:
+            # The scripts get every key they touch in KEYS, so the owner and
+            # the index are looked up here first.
+            if kwargs.get("user_id") is not None:
+                user_key = self._user_key(kwargs["user_id"])
+                token_ids = [
+                    token_id.decode()
+                    for token_id in await self.redis.zrange(user_key, 0, -1)
+                ]
+                if not token_ids:
+                    return False
+                revoked = await self._revoke_all(
+                    keys=[user_key] + [self._token_key(id) for id in token_ids],
+                    args=token_ids,
+                )
+                return bool(revoked)
+
+            token_id = self._lookup(kwargs)
+            if token_id is None:
+                raise ValueError("refresh_token, id or user_id is required")
+            token_key = self._token_key(token_id)
+            user_id = await self.redis.hget(token_key, "user_id")
+            if user_id is None:
+                return False
+            revoked = await self._revoke_one(
+                keys=[token_key, self._user_key(user_id.decode())],
+                args=[user_id, token_id],
+            )
+            return bool(revoked)
+        except Exception as e:
+            raise Exception(f"Delete Error in {self.__class__.__name__}: {e}")
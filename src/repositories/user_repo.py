@@ -4,6 +4,10 @@ from models.user_model import UserModel, AddressModel, TokenModel
 
 class UserRepository(SqlLayer):
     model = UserModel
+    cache_ttl = 300
+    cache_tags = ("user:{id}",)
+    # Logins read the hash by email, which is never cached.
+    cache_exclude = ("hash_password",)
 
 
 class AddressRepository(SqlLayer):
@@ -1,6 +1,7 @@
+import asyncio
+import contextvars
 import uuid
 import random
-import asyncio
 from datetime import datetime
 from typing import Protocol, Optional
 from fastapi import UploadFile
@@ -8,6 +9,8 @@ from fastapi import UploadFile
 from utils.repository import AbstractRepository
 from utils.cache_manager import AbstractCache
 from utils.email_manager import AbstractEmail
+from utils.logging import get_logger
+from utils.metrics import get_metrics
 from services.s3_avatar_uploader import S3AvatarUploader
 
 
@@ -29,6 +32,7 @@ class AuthService(Protocol):
         self.security_layer = security_layer()
         self.error_handler = error_handler
         self.template_handler = template_handler
+        self._background_tasks: set[asyncio.Task] = set()
 
     async def send_mail(self, recipient: str, subject: str, body_text: str) -> None:
         try:
@@ -54,9 +58,8 @@ class AuthService(Protocol):
             )
             if not data.get("count"):
                 data["count"] = 0
-            cache_data = await self.cache_manager.set(token=token, data=data, exp=exp)
-            await self.cache_manager.set(
-                token=str(data.get("id")), data=cache_data, exp=exp
+            await self.cache_manager.mset_with_ttl(
+                items={token: data, str(data.get("id")): token}, exp=exp
             )
             await self.send_mail(
                 recipient=data.get("email"),
@@ -70,18 +73,24 @@ class AuthService(Protocol):
     async def resend_email(self, user_id: uuid.UUID):
         try:
             token = await self.cache_manager.get(token=str(user_id))
-            data = await self.cache_manager.get(token=token)
-
-            if not data:
+            if not token:
                 raise self.error_handler(
                     status_code=400, detail="Токен підтвердження електронної пошти протермінований"
                 )
 
-            await asyncio.gather(
-                self.cache_manager.delete(token=token),
-                self.cache_manager.delete(token=str(user_id)),
+            data, _, _ = await (
+                self.cache_manager.pipeline()
+                .get(token=token)
+                .delete(token=token)
+                .delete(token=str(user_id))
+                .execute()
             )
 
+            if not data:
+                raise self.error_handler(
+                    status_code=400, detail="Токен підтвердження електронної пошти протермінований"
+                )
+
             if data.get("count") >= 3:
                 raise self.error_handler(status_code=429, detail="Забагато запитів")
 
@@ -96,8 +105,7 @@ class AuthService(Protocol):
     async def create_handler(self, data: dict) -> dict:
         try:
             if data.get("auth_type") == "local":
-                user_obj = await self.user_repo.get(email=data.get("email"))
-                if user_obj:
+                if await self.user_repo.exists(email=data.get("email")):
                     raise self.error_handler(
                         status_code=409, detail="Електронна пошта вже існує"
                     )
@@ -184,9 +192,9 @@ class AuthService(Protocol):
             if not data:
                 raise self.error_handler()
 
-            await self.cache_manager.delete(token=token)
-            await self.cache_manager.set(token=token, data=data, exp=180)
-            await self.cache_manager.set(token=str(data.get("id")), data=token, exp=180)
+            await self.cache_manager.mset_with_ttl(
+                items={token: data, str(data.get("id")): token}, exp=180
+            )
             return {"message": "Користувача успішно підтверджено"}
         except Exception:
             raise self.error_handler(status_code=500, detail="Упс! Щось пішло не так. Спробуйте пізніше")
@@ -238,15 +246,24 @@ class AuthService(Protocol):
     async def login_handler(self, data: dict) -> dict:
         try:
             user_obj = await self.user_repo.get(email=data.get("email"))
-            if not user_obj or not (
-                await self.security_layer.verify_password(
+            is_valid, new_hash = (
+                await self.security_layer.verify_and_update(
                     password=data.get("password"),
                     hash_password=user_obj.get("hash_password"),
                 )
-            ):
+                if user_obj
+                else (False, None)
+            )
+            if not is_valid:
                 raise self.error_handler(
                     status_code=400, detail="Недійсне ім'я користувача або пароль"
                 )
+            if new_hash:
+                self._rehash_in_background(
+                    user_id=user_obj.get("id"),
+                    old_hash=user_obj.get("hash_password"),
+                    new_hash=new_hash,
+                )
 
             token_pair = await self._generate_token_pair(
                 data=user_obj, user_agent=data.get("user_agent")
@@ -257,6 +274,27 @@ class AuthService(Protocol):
         except Exception as e:
             raise self.error_handler(status_code=500, detail="Упс! Щось пішло не так. Спробуйте пізніше")
 
+    def _rehash_in_background(
+        self, user_id: uuid.UUID, old_hash: str, new_hash: str
+    ) -> None:
+        # A fresh context, so the write gets its own session instead of the
+        # request's unit of work, which is closed by the time it runs.
+        task = asyncio.create_task(
+            self._rehash(user_id, old_hash, new_hash), context=contextvars.Context()
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _rehash(self, user_id: uuid.UUID, old_hash: str, new_hash: str) -> None:
+        try:
+            # Matching on the old hash leaves a password changed meanwhile alone.
+            if await self.user_repo.update(
+                id=user_id, hash_password=old_hash, data={"hash_password": new_hash}
+            ):
+                get_metrics().incr("password_rehashed")
+        except Exception as e:
+            get_logger().warning("Password rehash failed: %s", e)
+
     async def recreate_access_handler(self, data: dict) -> dict:
         try:
             payload = await self.security_layer.decode_token(
@@ -269,7 +307,12 @@ class AuthService(Protocol):
             if not user_obj:
                 raise self.error_handler(status_code=404, detail="User not found")
 
-            await self.refresh_repo.delete(refresh_token=data.get("refresh_token"))
+            # Each refresh token is good for one rotation; a revoked or
+            # already-used one is refused.
+            if not await self.refresh_repo.delete(
+                refresh_token=data.get("refresh_token")
+            ):
+                raise self.error_handler(status_code=401, detail="Несанкціонований доступ")
             return await self._generate_token_pair(
                 data=payload, user_agent=data.get("user_agent")
             )
@@ -8,8 +8,9 @@ from config import config_setting
 
 
 class LoadService:
-    def __init__(self):
-        self.s3 = boto3.client(
+    def __init__(self, s3=None):
+        # boto3 clients are thread-safe and slow to build; pass a shared one.
+        self.s3 = s3 or boto3.client(
             "s3",
             aws_access_key_id=config_setting.ACCESS_KEY,
             aws_secret_access_key=config_setting.SECRET_ACCESS_KEY,
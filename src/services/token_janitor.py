@@ -0,0 +1,145 @@
+"""
+Purges expired refresh tokens from the ``tokens`` table in small batches.
+
+Runs inside the application when TOKEN_JANITOR_ENABLED is set, or once
+from the command line (PostgreSQL only, it deletes by ``ctid``):
+
+    cd src && python -m services.token_janitor [--reindex]
+
+Verification and password-reset entries live in the cache with a TTL, so
+there is nothing to purge for them here.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, literal_column, select, text
+
+from config import config_setting
+from database import async_session_maker, engine
+from models.user_model import TokenModel
+from utils.cache_manager import get_cache_manager
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+class TokenJanitor:
+    """
+    Deletes expired tokens ``batch_size`` rows per transaction, so no
+    statement holds locks or bloats WAL for long, and sleeps between batches
+    to stay under ``max_rows_per_second``. Rows already locked by another
+    janitor are skipped rather than waited on.
+    """
+
+    lock_key = "lock:token_janitor"
+
+    def __init__(
+        self, batch_size: int, max_rows_per_second: float, interval: float
+    ) -> None:
+        self.batch_size = batch_size
+        self.pause = batch_size / max_rows_per_second if max_rows_per_second else 0
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def _delete_batch(self, now: datetime):
+        expired = (
+            select(literal_column("ctid"))
+            .select_from(TokenModel)
+            .where(TokenModel.expires_at < now)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return delete(TokenModel).where(literal_column("ctid").in_(expired))
+
+    async def purge_expired(self) -> int:
+        # expires_at is stored as naive UTC.
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        purged = 0
+        while True:
+            start = time.perf_counter()
+            async with async_session_maker() as session:
+                result = await session.execute(self._delete_batch(now))
+                await session.commit()
+            get_metrics().observe("token_janitor_batch", time.perf_counter() - start)
+            get_metrics().incr("token_janitor_purged", result.rowcount)
+            purged += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+        get_metrics().incr("token_janitor_runs")
+        get_logger().info("Token janitor purged %s expired tokens", purged)
+        return purged
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # One worker purges per interval; the others skip the round.
+                if await get_cache_manager().set_if_absent(
+                    self.lock_key, 1, exp=max(1, int(self.interval))
+                ):
+                    await self.purge_expired()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                get_metrics().incr("token_janitor_errors")
+                get_logger().warning("Token janitor error: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def get_token_janitor() -> TokenJanitor:
+    return TokenJanitor(
+        batch_size=config_setting.TOKEN_JANITOR_BATCH_SIZE,
+        max_rows_per_second=config_setting.TOKEN_JANITOR_MAX_ROWS_PER_SECOND,
+        interval=config_setting.TOKEN_JANITOR_INTERVAL,
+    )
+
+
+async def reindex_tokens() -> None:
+    # create_all does not add indexes to an existing table. Both statements
+    # leave writes unblocked and cannot run inside a transaction.
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(
+            text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tokens_expires_at "
+                "ON tokens (expires_at)"
+            )
+        )
+        await conn.execute(text("REINDEX TABLE CONCURRENTLY tokens"))
+
+
+async def main(reindex: bool) -> None:
+    try:
+        print(f"purged {await get_token_janitor().purge_expired()} expired tokens")
+        if reindex:
+            await reindex_tokens()
+            print("reindexed tokens")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="then add the expires_at index if missing and rebuild the indexes",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.reindex))
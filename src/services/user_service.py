@@ -4,6 +4,28 @@ from utils.repository import AbstractRepository
 from repositories.user_repo import TokenRepository
 from schemas.user_schema import UserUpdateAvatar
 from core.security import SecurityBase
+from config import config_setting
+from utils.cache_aside import cached
+from utils.logging import get_logger
+
+# What authenticated requests get as the current user: the profile fields
+# and role, without the password hash.
+CURRENT_USER_COLUMNS = [
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "about",
+    "avatar",
+    "phone",
+    "birth_date",
+    "created_at",
+    "updated_at",
+    "is_activate",
+    "is_locked",
+    "role_id",
+]
 
 class UserService(Protocol):
     def __init__(self, 
@@ -18,10 +40,21 @@ class UserService(Protocol):
         self.security_layer: SecurityBase = security_layer
 
 
+    @cached(
+        "current_user:{user_id}",
+        ttl=config_setting.AUTH_USER_CACHE_TTL,
+        tags=["user:{user_id}"],
+    )
+    async def get_current_user(self, user_id: uuid.UUID) -> dict:
+        # Tagged like UserRepository rows, so any update or delete of the
+        # user through the repository drops it.
+        return await self.user_repo.get(id=user_id, columns=CURRENT_USER_COLUMNS)
+
+
     async def get_one_user(self, user_id: str) -> dict:
         try:
             user_info_dict = await self.user_repo.get(id=user_id)
-            print(user_info_dict)
+            get_logger().debug("Loaded user %s", user_id)
             if not user_info_dict:
                 raise self.error_handler(status_code=404, detail="User not found")
             
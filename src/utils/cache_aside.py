@@ -0,0 +1,295 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import math
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Iterable, Optional, Union
+
+from config import config_setting
+from database import current_session, primary_pinned
+from utils.cache_manager import get_cache_manager
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+# A str.format template ("user:{id}") or a callable taking the same names.
+KeyBuilder = Union[str, Callable[..., str]]
+
+
+def render(template: KeyBuilder, values: dict) -> Optional[str]:
+    """Build a key or tag from ``values``; None when a name is missing."""
+    if callable(template):
+        return template(**values)
+    try:
+        return template.format(**values)
+    except (KeyError, IndexError, AttributeError):
+        return None
+
+
+def render_all(templates: Iterable[KeyBuilder], values: dict) -> set[str]:
+    rendered = (render(template, values) for template in templates)
+    return {tag for tag in rendered if tag is not None}
+
+
+def _entry_key(key: str) -> str:
+    return f"cache:{key}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+def _bypass() -> bool:
+    # A transaction that has written sees rows the cache must not store, and
+    # its invalidations only run after commit.
+    session = current_session.get()
+    return not config_setting.CACHE_ENABLED or bool(
+        session is not None and session.info.get("cache_tags")
+    )
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key in this process: the first
+    caller starts ``fn()`` as a task and everyone, the first caller included,
+    awaits it. A caller that is cancelled does not cancel the shared call.
+
+    The task runs in an empty context, so it does not borrow the first
+    caller's session, unit of work or loaders; ``fn`` must open its own
+    session rather than close over one from a request. Only the primary pin
+    is carried over, and pinned callers never share a call with unpinned
+    ones, so a request that has written never reads a lagging replica.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[tuple[str, bool], asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        pinned = primary_pinned.get()
+        call = (key, pinned)
+        task = self._calls.get(call)
+        if task is None:
+            context = contextvars.Context()
+            context.run(primary_pinned.set, pinned)
+            task = self._calls[call] = asyncio.create_task(fn(), context=context)
+            task.add_done_callback(lambda done: self._finish(call, done))
+        else:
+            get_metrics().incr("cache_single_flight_joins")
+        return await asyncio.shield(task)
+
+    def _finish(self, call: tuple[str, bool], task: asyncio.Task) -> None:
+        if self._calls.get(call) is task:
+            del self._calls[call]
+        # Mark the exception retrieved even if every caller went away.
+        if not task.cancelled():
+            task.exception()
+
+
+_flights = SingleFlight()
+
+
+async def _read(cache, key: str, tag_keys: list[str]) -> tuple[Optional[dict], list]:
+    """The entry for ``key`` if its tags are current, and the tag versions."""
+    entry, *versions = await cache.mget([_entry_key(key), *tag_keys])
+    if entry is not None and entry.get("tags") == versions:
+        return entry, versions
+
+    missing = {
+        tag_key: uuid.uuid4().hex
+        for tag_key, version in zip(tag_keys, versions)
+        if version is None
+    }
+    if missing:
+        await cache.mset_with_ttl(items=missing, exp=config_setting.CACHE_TAG_TTL)
+        versions = [missing.get(k, v) for k, v in zip(tag_keys, versions)]
+    return None, versions
+
+
+def _refresh_early(entry: dict) -> bool:
+    # XFetch: recompute before expiry with a probability that grows as expiry
+    # nears and with how long the value took to compute.
+    beta = config_setting.CACHE_XFETCH_BETA
+    delta, expiry = entry.get("delta"), entry.get("expiry")
+    if not beta or not delta or expiry is None:
+        return False
+    return time.time() - delta * beta * math.log(1 - random.random()) >= expiry
+
+
+async def _wait_for_entry(cache, key: str, tag_keys: list[str]) -> Optional[dict]:
+    deadline = time.monotonic() + config_setting.CACHE_LOCK_TTL
+    while time.monotonic() < deadline:
+        await asyncio.sleep(config_setting.CACHE_LOCK_POLL_INTERVAL)
+        entry, *versions = await cache.mget([_entry_key(key), *tag_keys])
+        if entry is not None and entry.get("tags") == versions:
+            return entry
+    return None
+
+
+async def _recompute(
+    cache,
+    key: str,
+    load: Callable[[], Awaitable[Any]],
+    ttl: int,
+    tag_keys: list[str],
+    versions: list,
+    stale: Optional[dict],
+    lock: bool,
+) -> Any:
+    locked = False
+    if lock:
+        try:
+            locked = await cache.set_if_absent(
+                token=f"lock:{key}", data=1, exp=config_setting.CACHE_LOCK_TTL
+            )
+        except Exception as e:
+            get_logger().warning("Cache lock failed for %s: %s", key, e)
+            locked = None
+        if locked is False:
+            # Another worker is computing the value: keep serving the old
+            # one, or wait for the new one rather than query as well.
+            if stale is not None:
+                return stale["value"]
+            get_metrics().incr("cache_lock_waits")
+            try:
+                entry = await _wait_for_entry(cache, key, tag_keys)
+            except Exception as e:
+                get_logger().warning("Cache read failed for %s: %s", key, e)
+                entry = None
+            if entry is not None:
+                return entry["value"]
+
+    try:
+        started = time.monotonic()
+        value = await load()
+        delta = time.monotonic() - started
+        if value:
+            try:
+                await cache.set(
+                    token=_entry_key(key),
+                    data={
+                        "value": value,
+                        "tags": versions,
+                        "delta": delta,
+                        "expiry": time.time() + ttl,
+                    },
+                    exp=ttl,
+                )
+            except Exception as e:
+                get_logger().warning("Cache write failed for %s: %s", key, e)
+        return value
+    finally:
+        if locked:
+            try:
+                await cache.delete(token=f"lock:{key}")
+            except Exception as e:
+                get_logger().warning("Cache unlock failed for %s: %s", key, e)
+
+
+async def cache_aside(
+    key: str,
+    load: Callable[[], Awaitable[Any]],
+    ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
+    lock: Optional[bool] = None,
+) -> Any:
+    """
+    Return the value cached under ``key`` or ``await load()`` and cache it.
+
+    Every tag is a key holding a random version; an entry stores the versions
+    its tags had before ``load()`` ran and is only served while they are all
+    unchanged, so invalidating a tag is a single write and a value loaded
+    concurrently with an invalidation is never served. Falsy results (not
+    found) are not cached, and cache errors fall back to ``load()``.
+
+    Concurrent misses for a key share one ``load()`` per process; with
+    ``lock`` (default ``CACHE_LOCK_ENABLED``) a Redis lock extends that to
+    every worker. Hot entries are recomputed shortly before they expire
+    (XFetch, ``CACHE_XFETCH_BETA``) so they rarely expire under load.
+    """
+    if _bypass():
+        return await load()
+
+    cache = get_cache_manager()
+    tag_keys = [_tag_key(tag) for tag in sorted(set(tags))]
+    try:
+        entry, versions = await _read(cache, key, tag_keys)
+    except Exception as e:
+        get_logger().warning("Cache read failed for %s: %s", key, e)
+        return await load()
+
+    if entry is None:
+        get_metrics().incr("cache_aside_misses")
+    elif _refresh_early(entry):
+        get_metrics().incr("cache_aside_early_refreshes")
+    else:
+        get_metrics().incr("cache_aside_hits")
+        return entry["value"]
+
+    return await _flights.do(
+        key,
+        lambda: _recompute(
+            cache,
+            key,
+            load,
+            ttl or config_setting.CACHE_DEFAULT_TTL,
+            tag_keys,
+            versions,
+            entry,
+            config_setting.CACHE_LOCK_ENABLED if lock is None else lock,
+        ),
+    )
+
+
+async def invalidate_tags(tags: Iterable[str]) -> None:
+    """Give every tag a new version, which retires all entries carrying it."""
+    items = {_tag_key(tag): uuid.uuid4().hex for tag in tags}
+    if not items or not config_setting.CACHE_ENABLED:
+        return
+    try:
+        await get_cache_manager().mset_with_ttl(
+            items=items, exp=config_setting.CACHE_TAG_TTL
+        )
+        get_metrics().incr("cache_aside_invalidations", len(items))
+    except Exception as e:
+        get_logger().error("Cache invalidation failed for %s: %s", sorted(items), e)
+
+
+def cached(
+    key: KeyBuilder,
+    ttl: Optional[int] = None,
+    tags: Iterable[KeyBuilder] = (),
+    lock: Optional[bool] = None,
+):
+    """
+    Cache-aside for an async function or method. ``key`` and ``tags`` are
+    rendered from the call's bound arguments::
+
+        @cached("user_profile:{user_id}", ttl=60, tags=["user:{user_id}"])
+        async def get_one_user(self, user_id): ...
+    """
+    tags = tuple(tags)
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            cache_key = render(key, bound.arguments)
+            if cache_key is None:
+                return await fn(*args, **kwargs)
+            return await cache_aside(
+                key=cache_key,
+                load=lambda: fn(*args, **kwargs),
+                ttl=ttl,
+                tags=render_all(tags, bound.arguments),
+                lock=lock,
+            )
+
+        return wrapper
+
+    return decorator
@@ -1,19 +1,67 @@
-import uuid
-from datetime import datetime
-import json
 from abc import ABC, abstractmethod
+from typing import Any, Optional
 
-from redis import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
 
 from config import config_setting
+from utils.serializers import AbstractSerializer, get_serializer
 
 
-class AbstractCache(ABC):
-    def __init__(self) -> None:
+_redis_pool: Optional[BlockingConnectionPool] = None
+
+
+def get_redis_pool() -> BlockingConnectionPool:
+    """Process-wide connection pool shared by every RedisManager."""
+    global _redis_pool
+    if _redis_pool is None:
+        _redis_pool = BlockingConnectionPool(
+            host=config_setting.REDIS_HOST,
+            port=config_setting.REDIS_PORT,
+            max_connections=config_setting.REDIS_MAX_CONNECTIONS,
+            socket_timeout=config_setting.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=config_setting.REDIS_SOCKET_CONNECT_TIMEOUT,
+            # Wait this long for a free connection instead of failing at once.
+            timeout=config_setting.REDIS_SOCKET_TIMEOUT,
+        )
+    return _redis_pool
+
+
+async def close_redis_pool() -> None:
+    global _redis_pool
+    if _redis_pool is not None:
+        await _redis_pool.disconnect()
+        _redis_pool = None
+
+
+class AbstractPipeline(ABC):
+    """
+    Commands queued with set/get/delete are sent in one round trip by
+    ``execute()``, which returns one result per queued command.
+    """
+
+    @abstractmethod
+    def set(self, token: str, data: Any, exp: Optional[int] = None):
+        pass
+
+    @abstractmethod
+    def get(self, token: str):
         pass
 
     @abstractmethod
-    async def set(self, token: str, data: dict, exp: int) -> str:
+    def delete(self, token: str):
+        pass
+
+    @abstractmethod
+    async def execute(self) -> list:
+        pass
+
+
+class AbstractCache(ABC):
+    def __init__(self, serializer: Optional[AbstractSerializer] = None) -> None:
+        self.serializer = serializer or get_serializer()
+
+    @abstractmethod
+    async def set(self, token: str, data: dict, exp: Optional[int] = None) -> str:
         pass
 
     @abstractmethod
@@ -24,41 +72,171 @@ class AbstractCache(ABC):
     async def delete(self, token: str) -> bool:
         pass
 
+    @abstractmethod
+    async def set_if_absent(
+        self, token: str, data: Any, exp: Optional[int] = None
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    async def incr(self, token: str, amount: int = 1, exp: Optional[int] = None) -> int:
+        """Atomically add ``amount``; a new counter expires after ``exp``."""
+
+    @abstractmethod
+    async def mset_with_ttl(self, items: dict[str, Any], exp: Optional[int]) -> None:
+        pass
+
+    @abstractmethod
+    async def mget(self, tokens: list[str]) -> list:
+        pass
+
+    @abstractmethod
+    def pipeline(self) -> AbstractPipeline:
+        pass
+
+    async def start(self) -> None:
+        """Called once at application startup."""
+
+    async def close(self) -> None:
+        """Called once at application shutdown."""
+
+
+class RedisPipeline(AbstractPipeline):
+    def __init__(self, manager: "RedisManager") -> None:
+        self.manager = manager
+        self.pipe = manager.redis.pipeline(transaction=True)
+        self.decoders = []
+
+    def set(self, token: str, data: Any, exp: Optional[int] = None):
+        self.pipe.set(token, self.manager.dumps(data), ex=exp or None)
+        self.decoders.append(None)
+        return self
+
+    def get(self, token: str):
+        self.pipe.get(token)
+        self.decoders.append(self.manager.loads)
+        return self
+
+    def delete(self, token: str):
+        self.pipe.delete(token)
+        self.decoders.append(None)
+        return self
+
+    async def execute(self) -> list:
+        try:
+            results = await self.pipe.execute()
+            return [
+                decode(result) if decode else result
+                for decode, result in zip(self.decoders, results)
+            ]
+        except Exception as e:
+            raise Exception(f"Redis Pipeline Error in {self.execute.__name__}: {e}")
+
 
 class RedisManager(AbstractCache):
-    def __init__(self) -> None:
-        self.redis = Redis(
-            host=config_setting.REDIS_HOST,
-            port=config_setting.REDIS_PORT,
-        )
+    def __init__(self, serializer: Optional[AbstractSerializer] = None) -> None:
+        super().__init__(serializer)
+        self.redis = Redis(connection_pool=get_redis_pool())
+
+    def dumps(self, data: Any) -> bytes:
+        return self.serializer.dumps(data)
 
-    async def set(self, token: str, data: dict, exp: int) -> str:
+    def loads(self, data: Optional[bytes]) -> Any:
+        return self.serializer.loads(data)
+
+    async def set(self, token: str, data: dict, exp: Optional[int] = None) -> str:
         try:
-            if isinstance(data, dict):
-                data = {
-                    k: str(v) if isinstance(v, (uuid.UUID, datetime)) else v
-                    for k, v in data.items()
-                }
-            self.redis.set(
-                token,
-                json.dumps(data),
-            )
-            if exp:
-                self.redis.expire(token, exp)
+            # SET ... EX in one command, so the key never exists without a TTL.
+            await self.redis.set(token, self.dumps(data), ex=exp or None)
             return token
         except Exception as e:
             raise Exception(f"Redis Set Error in {self.set.__name__}: {e}")
 
     async def get(self, token: str) -> dict:
         try:
-            data = self.redis.get(token)
-            if data:
-                return json.loads(data)
+            return self.loads(await self.redis.get(token))
         except Exception as e:
             raise Exception(f"Redis Get Error in {self.get.__name__}: {e}")
 
     async def delete(self, token: str) -> bool:
         try:
-            self.redis.delete(token)
+            await self.redis.delete(token)
         except Exception as e:
             raise Exception(f"Redis Delete Error in {self.delete.__name__}: {e}")
+
+    async def set_if_absent(
+        self, token: str, data: Any, exp: Optional[int] = None
+    ) -> bool:
+        try:
+            return bool(
+                await self.redis.set(token, self.dumps(data), ex=exp or None, nx=True)
+            )
+        except Exception as e:
+            raise Exception(
+                f"Redis Set-if-absent Error in {self.set_if_absent.__name__}: {e}"
+            )
+
+    async def incr(self, token: str, amount: int = 1, exp: Optional[int] = None) -> int:
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            if exp:
+                # Creates the counter with its TTL; an existing one keeps its own.
+                pipe.set(token, 0, ex=exp, nx=True)
+            pipe.incrby(token, amount)
+            return (await pipe.execute())[-1]
+        except Exception as e:
+            raise Exception(f"Redis Incr Error in {self.incr.__name__}: {e}")
+
+    async def mset_with_ttl(self, items: dict[str, Any], exp: Optional[int]) -> None:
+        pipe = self.pipeline()
+        for token, data in items.items():
+            pipe.set(token, data, exp)
+        await pipe.execute()
+
+    async def mget(self, tokens: list[str]) -> list:
+        try:
+            return [self.loads(data) for data in await self.redis.mget(tokens)]
+        except Exception as e:
+            raise Exception(f"Redis Mget Error in {self.mget.__name__}: {e}")
+
+    def pipeline(self) -> RedisPipeline:
+        return RedisPipeline(self)
+
+
+_cache_manager: Optional[AbstractCache] = None
+
+
+def get_cache_manager() -> AbstractCache:
+    """
+    Process-wide cache used by the services: Redis, optionally fronted by an
+    in-process L1 (``CACHE_L1_ENABLED``), or with ``CACHE_BACKEND=memory`` a
+    cache local to this process.
+    """
+    global _cache_manager
+    if _cache_manager is None:
+        if config_setting.CACHE_BACKEND == "memory":
+            from utils.memory_cache import MemoryCache
+
+            _cache_manager = MemoryCache(max_size=config_setting.CACHE_MEMORY_MAX_SIZE)
+        elif config_setting.CACHE_L1_ENABLED:
+            from utils.tiered_cache import RedisInvalidationBus, TieredCache
+
+            _cache_manager = TieredCache(
+                backend=RedisManager(),
+                max_size=config_setting.CACHE_L1_MAX_SIZE,
+                ttl=config_setting.CACHE_L1_TTL,
+                bus=RedisInvalidationBus(
+                    Redis(connection_pool=get_redis_pool()),
+                    channel=config_setting.CACHE_L1_INVALIDATION_CHANNEL,
+                ),
+            )
+        else:
+            _cache_manager = RedisManager()
+    return _cache_manager
+
+
+async def close_cache_manager() -> None:
+    global _cache_manager
+    if _cache_manager is not None:
+        await _cache_manager.close()
+        _cache_manager = None
@@ -0,0 +1,103 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterable, Optional
+
+
+class RepositoryLoader:
+    """
+    Request-scoped, DataLoader-style front for primary-key lookups of one
+    repository. Keys requested in the same event-loop tick are fetched with a
+    single ``get_many`` (``WHERE pk IN (...)``) and every result is memoised
+    until the repository writes to the model.
+    """
+
+    def __init__(self, repository) -> None:
+        self.repository = repository
+        self._cache: dict[Any, asyncio.Future] = {}
+        self._queue: list = []
+        self._dispatches: set[asyncio.Task] = set()
+
+    async def load(self, key: Any) -> dict:
+        future = self._cache.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._cache[key] = future
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                # A task owns the batch and starts on the next loop tick, so
+                # concurrent callers enqueue their keys first and it still
+                # runs if the caller that scheduled it is cancelled.
+                task = asyncio.get_running_loop().create_task(self._dispatch())
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+        # Shielded: a cancelled caller must not cancel the shared result.
+        value = await asyncio.shield(future)
+        return dict(value) if value else False
+
+    async def load_many(self, keys: Iterable[Any]) -> list[dict]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def __contains__(self, key: Any) -> bool:
+        """Whether ``key`` is memoised or being fetched."""
+        return key in self._cache
+
+    def prime(self, key: Any, value: dict) -> None:
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(dict(value))
+            self._cache[key] = future
+
+    def clear(self) -> None:
+        self._cache = {
+            key: future for key, future in self._cache.items() if not future.done()
+        }
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        futures = [self._cache[key] for key in keys]
+        try:
+            rows = await self.repository.get_many(keys, use_loader=False)
+        except BaseException as e:
+            for key, future in zip(keys, futures):
+                self._cache.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        found = {row[self.repository.pk_name]: row for row in rows}
+        for key, future in zip(keys, futures):
+            if not future.done():
+                future.set_result(found.get(key, False))
+
+
+# Loaders of the current request, keyed by model.
+current_loaders: ContextVar[Optional[dict]] = ContextVar(
+    "current_loaders", default=None
+)
+
+
+def get_loader(repository) -> Optional[RepositoryLoader]:
+    loaders = current_loaders.get()
+    if loaders is None:
+        return None
+    loader = loaders.get(repository.model)
+    if loader is None:
+        loader = loaders[repository.model] = RepositoryLoader(repository)
+    return loader
+
+
+@asynccontextmanager
+async def loader_scope() -> AsyncIterator[dict]:
+    loaders = current_loaders.get()
+    if loaders is not None:
+        yield loaders
+        return
+
+    token = current_loaders.set({})
+    try:
+        yield current_loaders.get()
+    finally:
+        current_loaders.reset(token)
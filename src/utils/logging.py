@@ -1,14 +1,64 @@
+import atexit
+import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from config import config_setting
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Appends the ``fields`` passed via ``extra`` to the message, or renders the
+    whole record as one JSON object when ``as_json`` is set.
+    """
+
+    def __init__(self, as_json: bool = False) -> None:
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None)
+        if not self.as_json:
+            message = super().format(record)
+            if fields:
+                message += " " + json.dumps(fields, default=str)
+            return message
+
+        payload = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if fields:
+            payload.update(fields)
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    # The stock prepare() formats the record on the calling thread; hand it
+    # over untouched so formatting happens on the listener thread.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 
 loggerObj = logging.getLogger(__name__)
-loggerObj.setLevel(logging.INFO)
+loggerObj.setLevel(config_setting.LOG_LEVEL)
 
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+formatter = StructuredFormatter(as_json=config_setting.LOG_FORMAT == "json")
 
 consoleHandler = logging.StreamHandler()
 consoleHandler.setFormatter(formatter)
-loggerObj.addHandler(consoleHandler)
+
+# Records are queued on the event loop and written by a background thread.
+log_queue = queue.SimpleQueue()
+loggerObj.addHandler(DeferredQueueHandler(log_queue))
+listener = QueueListener(log_queue, consoleHandler)
+listener.start()
+atexit.register(listener.stop)
 
 
 def get_logger():
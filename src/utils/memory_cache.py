@@ -0,0 +1,113 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from utils.cache_manager import AbstractCache, AbstractPipeline
+from utils.metrics import get_metrics
+from utils.serializers import AbstractSerializer
+
+
+class MemoryPipeline(AbstractPipeline):
+    def __init__(self, cache: "MemoryCache") -> None:
+        self.cache = cache
+        self.commands: list[Callable[[], Any]] = []
+
+    def set(self, token: str, data: Any, exp: Optional[int] = None):
+        self.commands.append(lambda: self.cache._set(token, data, exp))
+        return self
+
+    def get(self, token: str):
+        self.commands.append(lambda: self.cache._get(token))
+        return self
+
+    def delete(self, token: str):
+        self.commands.append(lambda: self.cache._delete(token))
+        return self
+
+    async def execute(self) -> list:
+        # Nothing awaits in between, so the commands apply atomically.
+        return [command() for command in self.commands]
+
+
+class MemoryCache(AbstractCache):
+    """
+    In-process AbstractCache for tests and single-node deployments. Values
+    go through the serializer like they would to Redis, expire after their
+    TTL and, past ``max_size`` keys, the least recently used one is evicted.
+    """
+
+    def __init__(
+        self, max_size: int, serializer: Optional[AbstractSerializer] = None
+    ) -> None:
+        super().__init__(serializer)
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[Optional[float], bytes]] = OrderedDict()
+        get_metrics().gauge("cache_memory_size", lambda: len(self._data))
+
+    def _entry(self, token: str) -> Optional[tuple[Optional[float], bytes]]:
+        entry = self._data.get(token)
+        if entry is None:
+            return None
+        expires_at, _ = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[token]
+            return None
+        self._data.move_to_end(token)
+        return entry
+
+    def _store(self, token: str, payload: bytes, expires_at: Optional[float]) -> None:
+        self._data[token] = (expires_at, payload)
+        self._data.move_to_end(token)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            get_metrics().incr("cache_memory_evictions")
+
+    def _set(self, token: str, data: Any, exp: Optional[int] = None) -> bool:
+        expires_at = time.monotonic() + exp if exp else None
+        self._store(token, self.serializer.dumps(data), expires_at)
+        return True
+
+    def _get(self, token: str) -> Any:
+        entry = self._entry(token)
+        return self.serializer.loads(entry[1]) if entry else None
+
+    def _delete(self, token: str) -> int:
+        return int(self._data.pop(token, None) is not None)
+
+    async def set(self, token: str, data: dict, exp: Optional[int] = None) -> str:
+        self._set(token, data, exp)
+        return token
+
+    async def get(self, token: str) -> dict:
+        return self._get(token)
+
+    async def delete(self, token: str) -> bool:
+        return bool(self._delete(token))
+
+    async def set_if_absent(
+        self, token: str, data: Any, exp: Optional[int] = None
+    ) -> bool:
+        if self._entry(token) is not None:
+            return False
+        return self._set(token, data, exp)
+
+    async def incr(self, token: str, amount: int = 1, exp: Optional[int] = None) -> int:
+        entry = self._entry(token)
+        if entry is None:
+            expires_at, value = (time.monotonic() + exp if exp else None), 0
+        else:
+            expires_at, value = entry[0], int(entry[1])
+        value += amount
+        # Stored as a bare integer, like Redis INCRBY.
+        self._store(token, str(value).encode(), expires_at)
+        return value
+
+    async def mset_with_ttl(self, items: dict[str, Any], exp: Optional[int]) -> None:
+        for token, data in items.items():
+            self._set(token, data, exp)
+
+    async def mget(self, tokens: list[str]) -> list:
+        return [self._get(token) for token in tokens]
+
+    def pipeline(self) -> MemoryPipeline:
+        return MemoryPipeline(self)
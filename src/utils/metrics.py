@@ -0,0 +1,53 @@
+import threading
+from typing import Callable
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry: counters, gauges (set directly or
+    read from a callable at snapshot time) and timers that keep count, total
+    and max of the observed durations.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float | Callable[[], float]] = {}
+        self._timers: dict[str, dict[str, float]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float | Callable[[], float]) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timer = self._timers.setdefault(
+                name, {"count": 0, "total": 0.0, "max": 0.0}
+            )
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            gauges = dict(self._gauges)
+            result = {
+                "counters": dict(self._counters),
+                "timers": {name: dict(timer) for name, timer in self._timers.items()},
+            }
+        result["gauges"] = {
+            name: value() if callable(value) else value
+            for name, value in gauges.items()
+        }
+        return result
+
+
+metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return metrics
@@ -0,0 +1,75 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from config import config_setting
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+class QueryStats:
+    """SQL statements issued while handling one request."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    get_metrics().incr("db_statements")
+    get_metrics().observe("db_statement_time", duration)
+
+    if duration * 1000 >= config_setting.DB_SLOW_QUERY_MS:
+        get_metrics().incr("db_slow_statements")
+        get_logger().warning(
+            "SLOW QUERY: %.1f ms: %s", duration * 1000, " ".join(statement.split())
+        )
+
+
+def instrument_engine(engine) -> None:
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def query_stats_middleware(request, call_next):
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+
+    get_metrics().observe("db_statements_per_request", stats.count)
+    get_metrics().observe("db_time_per_request", stats.total_time)
+    if config_setting.DEBUG:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Query-Time-Ms"] = f"{stats.total_time * 1000:.1f}"
+        response.headers["X-DB-Slowest-Query-Ms"] = f"{stats.slowest_time * 1000:.1f}"
+    return response
@@ -0,0 +1,168 @@
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from redis.asyncio import Redis
+
+from config import config_setting
+from utils.cache_manager import get_redis_pool
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+# Sliding-window log: one sorted-set member per request in the last window.
+# Returns {1, 0} when the request is admitted, {0, ms until a slot frees}
+# otherwise. Server time keeps every worker on the same clock.
+SLIDING_WINDOW = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) < limit then
+    redis.call('ZADD', KEYS[1], now, now .. ':' .. ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return {1, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, tonumber(oldest[2]) + window - now}
+"""
+
+
+class RateLimitExceeded(HTTPException):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(
+            status_code=429,
+            detail="Забагато запитів",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class AbstractRateLimiter(ABC):
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        """Count a request; return seconds to wait if it is over the limit."""
+
+
+class MemoryRateLimiter(AbstractRateLimiter):
+    """Per-process sliding-window log, bounded to ``max_keys`` keys."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._hits: OrderedDict[str, deque] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        now = time.monotonic()
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+        self._hits.move_to_end(key)
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        if len(hits) < limit:
+            hits.append(now)
+            return None
+        return hits[0] + window - now
+
+
+class RedisRateLimiter(AbstractRateLimiter):
+    """
+    Sliding-window log in Redis, shared by every worker: one script call
+    per request. While Redis is unreachable it falls back to a per-process
+    limiter, so limits still hold per worker.
+    """
+
+    def __init__(self, fallback: AbstractRateLimiter) -> None:
+        self.redis = Redis(connection_pool=get_redis_pool())
+        self.script = self.redis.register_script(SLIDING_WINDOW)
+        self.fallback = fallback
+
+    async def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        try:
+            allowed, retry_ms = await self.script(
+                keys=[key], args=[int(window * 1000), limit, uuid.uuid4().hex]
+            )
+        except Exception as e:
+            get_metrics().incr("rate_limit_fallback")
+            get_logger().warning("Rate limiter falling back to memory: %s", e)
+            return await self.fallback.hit(key, limit, window)
+        return None if allowed else int(retry_ms) / 1000
+
+
+_rate_limiter: Optional[AbstractRateLimiter] = None
+
+
+def get_rate_limiter() -> AbstractRateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        memory = MemoryRateLimiter(max_keys=config_setting.RATE_LIMIT_MEMORY_MAX_KEYS)
+        _rate_limiter = (
+            memory
+            if config_setting.CACHE_BACKEND == "memory"
+            else RedisRateLimiter(fallback=memory)
+        )
+    return _rate_limiter
+
+
+def close_rate_limiter() -> None:
+    global _rate_limiter
+    _rate_limiter = None
+
+
+def client_ip(request: Request) -> str:
+    # Behind nginx the peer is the proxy; it passes the real address on.
+    header = config_setting.RATE_LIMIT_IP_HEADER
+    if header and request.headers.get(header):
+        return request.headers[header]
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    """
+    Route dependency allowing ``limit`` requests per ``window`` seconds for
+    each value of ``by``: ``"ip"`` for the client address, otherwise a path
+    parameter or a field of the JSON body. Requests without that value are
+    not limited by it::
+
+        @router.post("/login", dependencies=[Depends(RateLimit("login", 5, 60, by="email"))])
+    """
+
+    def __init__(self, name: str, limit: int, window: float, by: str = "ip") -> None:
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.by = by
+
+    async def _value(self, request: Request) -> Optional[str]:
+        if self.by == "ip":
+            return client_ip(request)
+        if self.by in request.path_params:
+            return str(request.path_params[self.by])
+        try:
+            # FastAPI has already read the body; this reuses it.
+            body = await request.json()
+        except ValueError:
+            return None
+        value = body.get(self.by) if isinstance(body, dict) else None
+        return str(value).strip().lower() if value else None
+
+    async def __call__(self, request: Request) -> None:
+        if not config_setting.RATE_LIMIT_ENABLED:
+            return
+        value = await self._value(request)
+        if value is None:
+            return
+        key = f"rate_limit:{self.name}:{self.by}:{value}"
+        retry_after = await get_rate_limiter().hit(key, self.limit, self.window)
+        if retry_after is None:
+            get_metrics().incr("rate_limit_allowed")
+            return
+        get_metrics().incr("rate_limit_rejected")
+        get_metrics().incr(f"rate_limit_{self.name}_rejected")
+        raise RateLimitExceeded(retry_after)
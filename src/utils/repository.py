@@ -1,7 +1,13 @@
+import logging
 from abc import ABC, abstractmethod
-from typing import Any
-from sqlalchemy import select
-from database import async_session_maker
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable, Optional
+from sqlalchemy import select, update, delete, insert, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import async_session_maker, current_session, primary_pinned, read_session
+from utils.cache_aside import cache_aside, invalidate_tags, render_all
+from utils.loader import get_loader
 from utils.logging import get_logger
 
 
@@ -13,11 +19,51 @@ class AbstractRepository(ABC):
         pass
 
     @abstractmethod
-    async def get(self, *args: Any, **kwargs: Any) -> dict:
+    async def insert_many(
+        self,
+        rows: Iterable[dict],
+        chunk_size: Optional[int] = None,
+        returning: bool = True,
+    ) -> list[dict] | int:
+        pass
+
+    @abstractmethod
+    async def upsert_many(
+        self,
+        rows: Iterable[dict],
+        conflict_cols: list[str],
+        update_cols: Optional[list[str]] = None,
+        chunk_size: Optional[int] = None,
+        returning: bool = True,
+    ) -> list[dict] | int:
+        pass
+
+    @abstractmethod
+    async def get(
+        self, *args: Any, columns: Optional[list[str]] = None, **kwargs: Any
+    ) -> dict:
+        pass
+
+    @abstractmethod
+    async def get_all(
+        self, *args: Any, columns: Optional[list[str]] = None, **kwargs: Any
+    ) -> list[dict]:
+        pass
+
+    @abstractmethod
+    async def get_many(
+        self, values: Iterable[Any], column: Optional[str] = None
+    ) -> list[dict]:
         pass
 
     @abstractmethod
-    async def get_all(self, *args: Any, **kwargs: Any) -> list[dict]:
+    async def exists(self, **kwargs: Any) -> bool:
+        pass
+
+    @abstractmethod
+    def iter_all(
+        self, batch_size: Optional[int] = None, **kwargs: Any
+    ) -> AsyncIterator[dict]:
         pass
 
     @abstractmethod
@@ -31,113 +77,471 @@ class AbstractRepository(ABC):
 
 class SqlLayer(AbstractRepository):
     model = None
+    # One UPDATE/DELETE ... RETURNING statement instead of load-modify-save.
+    # Turn off for models that rely on ORM-level cascades or attribute events.
+    set_based_writes = True
+    # Rows per INSERT statement for insert_many/upsert_many.
+    bulk_chunk_size = 1000
+    # Rows fetched per keyset page by iter_all.
+    iter_batch_size = 500
+    # Seconds a primary-key get() stays cached; None disables caching.
+    cache_ttl: Optional[int] = None
+    # Keys left out of cached primary-key gets, e.g. secrets that must not be
+    # copied into Redis and every worker's L1.
+    cache_exclude: tuple = ()
+    # Tags ("user:{id}") rendered from each written row and invalidated after
+    # commit, so cached reads built on this model are dropped.
+    cache_tags: tuple = ()
+
+    @asynccontextmanager
+    async def _session(self, read_only: bool = False) -> AsyncIterator[AsyncSession]:
+        session = current_session.get()
+        if session is not None:
+            yield session
+            return
+        session_factory = read_session if read_only else async_session_maker
+        async with session_factory() as session:
+            yield session
+
+    @property
+    def pk_name(self) -> str:
+        (pk,) = self.model.__mapper__.primary_key
+        return self.model.__mapper__.get_property_by_column(pk).key
+
+    def _pk_value(self, value: Any) -> Any:
+        """``value`` as the primary key's type; None if it can't be one."""
+        (pk,) = self.model.__mapper__.primary_key
+        python_type = pk.type.python_type
+        if value is None or isinstance(value, python_type):
+            return value
+        try:
+            return python_type(value)
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    def _log(
+        self,
+        level: int,
+        event: str,
+        data: Optional[dict] = None,
+        filters: Optional[dict] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        # Only column names and primary-key values are logged, never row data.
+        logger = get_logger()
+        if not logger.isEnabledFor(level):
+            return
+        fields = {"model": self.model.__name__}
+        if data is not None:
+            fields["keys"] = sorted(data)
+        if filters:
+            fields["filters"] = sorted(filters)
+            if filters.get(self.pk_name) is not None:
+                fields["id"] = filters[self.pk_name]
+        if error is not None:
+            # SQLAlchemy errors embed bound parameters; keep the driver message.
+            fields["error"] = str(getattr(error, "orig", None) or error)
+        logger.log(
+            level, "%s: %s", event, self.model.__name__, extra={"fields": fields}
+        )
+
+    def _row_values(self, obj: Any) -> dict:
+        return {
+            attr.key: getattr(obj, attr.key)
+            for attr in self.model.__mapper__.column_attrs
+        }
+
+    def _tags(self, rows: Iterable[dict]) -> set[str]:
+        if not (self.cache_ttl or self.cache_tags):
+            return set()
+        tags = set()
+        for row in rows:
+            tags |= render_all(self.cache_tags, row)
+            if self.cache_ttl and row.get(self.pk_name) is not None:
+                tags.add(f"{self.model.__tablename__}:{row[self.pk_name]}")
+        return tags
+
+    async def _commit(self, session: AsyncSession, tags: Iterable[str] = ()) -> None:
+        loader = get_loader(self)
+        if loader is not None:
+            loader.clear()
+        primary_pinned.set(True)
+        # Inside a unit of work the owner commits once; just push the SQL.
+        if session is current_session.get():
+            await session.flush()
+            if tags:
+                pending = session.info.get("cache_tags")
+                if pending is None:
+                    pending = session.info["cache_tags"] = set()
+                    session.info.setdefault("after_commit", []).append(
+                        lambda: invalidate_tags(pending)
+                    )
+                pending.update(tags)
+        else:
+            await session.commit()
+            await invalidate_tags(tags)
+
+    @staticmethod
+    async def _rollback(session: AsyncSession) -> None:
+        if session is not current_session.get():
+            await session.rollback()
 
     async def insert(self, data: dict) -> dict:
-        async with async_session_maker() as session:
+        async with self._session() as session:
             try:
                 stmt = self.model(**data)
                 session.add(stmt)
-                await session.commit()
-                get_logger().info(
-                    f"DATA INSERTED: {self.model.__name__} with data: {data}"
-                )
+                await self._commit(session, self._tags([data]))
+                self._log(logging.INFO, "DATA INSERTED", data=data)
                 await session.refresh(stmt)
                 return await stmt.to_dict()
             except Exception as e:
-                get_logger().error(f"ERROR INSERTING: {self.model.__name__}: {e}")
-                await session.rollback()
+                self._log(logging.ERROR, "ERROR INSERTING", data=data, error=e)
+                await self._rollback(session)
                 raise Exception(f"Insert Error in {self.model.__class__.__name__}: {e}")
 
-    async def get(self, *args: Any, **kwargs: Any) -> dict:
-        async with async_session_maker() as session:
+    def _chunks(self, rows: Iterable[dict], chunk_size: Optional[int]):
+        chunk_size = chunk_size or self.bulk_chunk_size
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def _bulk_execute(
+        self, session: AsyncSession, stmt, rows, chunk_size, returning
+    ) -> list[dict] | int:
+        if returning:
+            stmt = stmt.returning(self.model)
+        result, count, tags = [], 0, set()
+        for chunk in self._chunks(rows, chunk_size):
+            if returning:
+                res = (
+                    await session.scalars(
+                        stmt,
+                        chunk,
+                        execution_options={"populate_existing": True},
+                    )
+                ).all()
+                tags |= self._tags(self._row_values(row) for row in res)
+                result.extend([await row.to_dict() for row in res])
+            else:
+                await session.execute(stmt, chunk)
+                # Without RETURNING only the columns passed in are known.
+                tags |= self._tags(chunk)
+            count += len(chunk)
+        await self._commit(session, tags)
+        return result if returning else count
+
+    async def insert_many(
+        self,
+        rows: Iterable[dict],
+        chunk_size: Optional[int] = None,
+        returning: bool = True,
+    ) -> list[dict] | int:
+        async with self._session() as session:
             try:
-                stmt = select(self.model).filter_by(**kwargs)
-                res = await session.execute(stmt)
-                res = res.scalar_one_or_none()
-                if res is None:
-                    return False
-                get_logger().info(
-                    f"DATA GET: {self.model.__name__} with data: {args}, {kwargs}"
+                res = await self._bulk_execute(
+                    session, insert(self.model), rows, chunk_size, returning
                 )
-                return await res.to_dict()
+                self._log(logging.INFO, "DATA BULK INSERTED")
+                return res
             except Exception as e:
-                get_logger().info(
-                    f"DATA NOT GET: {self.model.__name__} with data: {args}, {kwargs}"
+                self._log(logging.ERROR, "ERROR BULK INSERTING", error=e)
+                await self._rollback(session)
+                raise Exception(
+                    f"Insert-many Error in {self.model.__class__.__name__}: {e}"
                 )
-                raise Exception(f"Get Error in {self.model.__class__.__name__}: {e}")
 
-    async def get_all(self, *args: Any, **kwargs: Any) -> list[dict]:
-        async with async_session_maker() as session:
+    async def upsert_many(
+        self,
+        rows: Iterable[dict],
+        conflict_cols: list[str],
+        update_cols: Optional[list[str]] = None,
+        chunk_size: Optional[int] = None,
+        returning: bool = True,
+    ) -> list[dict] | int:
+        """
+        INSERT ... ON CONFLICT (conflict_cols) DO UPDATE. ``update_cols``
+        defaults to every column of the first row except the conflict
+        columns; with nothing to update the conflicting rows are skipped.
+        """
+        rows = list(rows)
+        if not rows:
+            return [] if returning else 0
+        async with self._session() as session:
             try:
-                stmt = select(self.model).filter_by(**kwargs)
-                res = await session.execute(stmt)
-                get_logger().info(
-                    f"DATA ALL GET: {self.model.__name__} with data: {args}, {kwargs}"
+                dialect = session.get_bind().dialect.name
+                dialect_insert = {
+                    "postgresql": postgresql.insert,
+                    "sqlite": sqlite.insert,
+                }[dialect]
+                if update_cols is None:
+                    update_cols = [c for c in rows[0] if c not in conflict_cols]
+
+                stmt = dialect_insert(self.model)
+                if update_cols:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=conflict_cols,
+                        set_={col: stmt.excluded[col] for col in update_cols},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=conflict_cols)
+
+                res = await self._bulk_execute(
+                    session, stmt, rows, chunk_size, returning
                 )
-                return [await row.to_dict() for row in res.scalars().all() if row]
+                self._log(logging.INFO, "DATA BULK UPSERTED")
+                return res
             except Exception as e:
-                get_logger().info(
-                    f"DATA NOT ALL GET: {self.model.__name__} with data: {args}, {kwargs}"
+                self._log(logging.ERROR, "ERROR BULK UPSERTING", error=e)
+                await self._rollback(session)
+                raise Exception(
+                    f"Upsert-many Error in {self.model.__class__.__name__}: {e}"
                 )
+
+    def _select(self, columns: Optional[list[str]], **kwargs: Any):
+        if columns:
+            entities = [getattr(self.model, column) for column in columns]
+        else:
+            entities = [self.model]
+        return select(*entities).select_from(self.model).filter_by(**kwargs)
+
+    async def get(
+        self, *args: Any, columns: Optional[list[str]] = None, **kwargs: Any
+    ) -> dict:
+        """
+        With ``columns`` only those columns are selected and a plain dict is
+        returned straight from the row, skipping ORM hydration and to_dict().
+        Primary-key lookups are cached for ``cache_ttl`` seconds when set;
+        the request loader is asked first, so repeating one in a request
+        does not go to the cache again.
+        """
+        if not columns and list(kwargs) == [self.pk_name]:
+            pk = self._pk_value(kwargs[self.pk_name])
+            if pk is None:
+                # No row has this key.
+                return False
+            if self.cache_ttl:
+                return await self._get_cached(pk)
+            return await self._get_by_pk(pk)
+        return await self._get_where(columns, **kwargs)
+
+    async def _get_cached(self, pk: Any) -> dict:
+        loader = get_loader(self)
+        if loader is not None and pk in loader:
+            return self._cacheable(await loader.load(pk))
+        res = await cache_aside(
+            key=f"{self.model.__tablename__}:{pk}",
+            load=lambda: self._get_uncached(pk),
+            ttl=self.cache_ttl,
+            tags=self._tags([{self.pk_name: pk}]),
+        )
+        if loader is not None and res:
+            loader.prime(pk, res)
+        return res
+
+    async def _get_uncached(self, pk: Any) -> dict:
+        return self._cacheable(await self._get_where(None, **{self.pk_name: pk}))
+
+    def _cacheable(self, res: dict) -> dict:
+        if not res or not self.cache_exclude:
+            return res
+        return {k: v for k, v in res.items() if k not in self.cache_exclude}
+
+    async def _get_by_pk(self, pk: Any) -> dict:
+        loader = get_loader(self)
+        if loader is not None:
+            return await loader.load(pk)
+        return await self._get_where(None, **{self.pk_name: pk})
+
+    async def _get_where(self, columns: Optional[list[str]], **kwargs: Any) -> dict:
+        async with self._session(read_only=True) as session:
+            try:
+                res = await session.execute(self._select(columns, **kwargs))
+                if columns:
+                    res = res.mappings().one_or_none()
+                else:
+                    res = res.scalar_one_or_none()
+                if res is None:
+                    return False
+                self._log(logging.INFO, "DATA GET", filters=kwargs)
+                return dict(res) if columns else await res.to_dict()
+            except Exception as e:
+                self._log(logging.INFO, "DATA NOT GET", filters=kwargs, error=e)
+                raise Exception(f"Get Error in {self.model.__class__.__name__}: {e}")
+
+    async def get_all(
+        self, *args: Any, columns: Optional[list[str]] = None, **kwargs: Any
+    ) -> list[dict]:
+        async with self._session(read_only=True) as session:
+            try:
+                res = await session.execute(self._select(columns, **kwargs))
+                self._log(logging.INFO, "DATA ALL GET", filters=kwargs)
+                if columns:
+                    return [dict(row) for row in res.mappings().all()]
+                return [await row.to_dict() for row in res.scalars().all() if row]
+            except Exception as e:
+                self._log(logging.INFO, "DATA NOT ALL GET", filters=kwargs, error=e)
                 raise Exception(
                     f"Get-all Error in {self.model.__class__.__name__}: {e}"
                 )
 
+    async def get_many(
+        self,
+        values: Iterable[Any],
+        column: Optional[str] = None,
+        use_loader: bool = True,
+    ) -> list[dict]:
+        """
+        Rows whose ``column`` (the primary key by default) is in ``values``,
+        in one ``WHERE column IN (...)`` query. Primary-key lookups go through
+        the request loader when one is active.
+        """
+        column = column or self.pk_name
+        loader = get_loader(self) if use_loader else None
+        if loader is not None and column == self.pk_name:
+            keys = (self._pk_value(value) for value in values)
+            rows = await loader.load_many(key for key in keys if key is not None)
+            return [row for row in rows if row]
+
+        values = list(values)
+        if not values:
+            return []
+        async with self._session(read_only=True) as session:
+            try:
+                stmt = select(self.model).where(getattr(self.model, column).in_(values))
+                res = await session.execute(stmt)
+                return [await row.to_dict() for row in res.scalars().all()]
+            except Exception as e:
+                self._log(
+                    logging.INFO, "DATA NOT MANY GET", filters={column: None}, error=e
+                )
+                raise Exception(
+                    f"Get-many Error in {self.model.__class__.__name__}: {e}"
+                )
+
+    async def exists(self, **kwargs: Any) -> bool:
+        async with self._session(read_only=True) as session:
+            try:
+                stmt = (
+                    select(literal(1))
+                    .select_from(self.model)
+                    .filter_by(**kwargs)
+                    .limit(1)
+                )
+                res = await session.execute(stmt)
+                return res.scalar() is not None
+            except Exception as e:
+                self._log(logging.INFO, "DATA NOT EXISTS", filters=kwargs, error=e)
+                raise Exception(f"Exists Error in {self.model.__class__.__name__}: {e}")
+
+    async def iter_all(
+        self, batch_size: Optional[int] = None, **kwargs: Any
+    ) -> AsyncIterator[dict]:
+        """
+        Yield rows matching ``kwargs`` in primary-key order, one keyset page
+        (``WHERE pk > last ORDER BY pk LIMIT batch_size``) at a time, so
+        memory stays flat regardless of table size.
+        """
+        batch_size = batch_size or self.iter_batch_size
+        (pk,) = self.model.__mapper__.primary_key
+        pk_attr = self.model.__mapper__.get_property_by_column(pk).key
+        last = None
+        while True:
+            stmt = select(self.model).filter_by(**kwargs)
+            if last is not None:
+                stmt = stmt.where(pk > last)
+            stmt = stmt.order_by(pk).limit(batch_size)
+            async with self._session(read_only=True) as session:
+                try:
+                    rows = (await session.execute(stmt)).scalars().all()
+                    batch = [await row.to_dict() for row in rows]
+                except Exception as e:
+                    self._log(
+                        logging.INFO, "DATA NOT ITER GET", filters=kwargs, error=e
+                    )
+                    raise Exception(
+                        f"Iter-all Error in {self.model.__class__.__name__}: {e}"
+                    )
+            for row in batch:
+                yield row
+            if len(batch) < batch_size:
+                return
+            last = getattr(rows[-1], pk_attr)
+
     async def update(
         self,
         data: dict,
         *args: Any,
         **kwargs: Any,
     ) -> dict:
-        async with async_session_maker() as session:
+        async with self._session() as session:
             try:
-                stmt = await session.execute(select(self.model).filter_by(**kwargs))
-                res = stmt.scalar_one_or_none()
+                if self.set_based_writes:
+                    stmt = await session.execute(
+                        update(self.model)
+                        .filter_by(**kwargs)
+                        .values(**data)
+                        .returning(self.model)
+                        .execution_options(populate_existing=True)
+                    )
+                    # Like the ORM path, more than one match is an error and
+                    # the update is rolled back.
+                    res = stmt.scalars().one_or_none()
+                else:
+                    stmt = await session.execute(select(self.model).filter_by(**kwargs))
+                    res = stmt.scalar_one_or_none()
+                    if res:
+                        for (
+                            key,
+                            value,
+                        ) in data.items():
+                            setattr(res, key, value)
 
                 if not res:
                     return False
 
-                for (
-                    key,
-                    value,
-                ) in data.items():
-                    setattr(res, key, value)
-
-                await session.commit()
-                await session.refresh(res)
-                get_logger().info(
-                    f"DATA UPDATED: {self.model.__name__} with data: {data}, {args}, {kwargs}"
-                )
+                await self._commit(session, self._tags([self._row_values(res)]))
+                if not self.set_based_writes:
+                    await session.refresh(res)
+                self._log(logging.INFO, "DATA UPDATED", data=data, filters=kwargs)
                 return await res.to_dict()
             except Exception as e:
-                await session.rollback()
-                get_logger().info(
-                    f"DATA NOT UPDATED: {self.model.__name__} with data: {data}, {args}, {kwargs}"
+                await self._rollback(session)
+                self._log(
+                    logging.INFO, "DATA NOT UPDATED", data=data, filters=kwargs, error=e
                 )
                 raise Exception(f"Update Error in {self.model.__class__.__name__}: {e}")
 
     async def delete(self, *args: Any, **kwargs: Any) -> bool:
-        async with async_session_maker() as session:
+        async with self._session() as session:
             try:
-                stmt = await session.execute(select(self.model).filter_by(**kwargs))
-                res = stmt.scalars().all()  # new libe added
-                # res = stmt.scalar_one_or_none()
-
-                for one_res in res:
-                    await session.delete(one_res)
+                if self.set_based_writes:
+                    stmt = await session.execute(
+                        delete(self.model)
+                        .filter_by(**kwargs)
+                        .returning(*self.model.__mapper__.primary_key)
+                    )
+                    res = stmt.all()
+                    rows = [dict(row._mapping) for row in res]
+                else:
+                    stmt = await session.execute(select(self.model).filter_by(**kwargs))
+                    res = stmt.scalars().all()
+                    rows = [self._row_values(one_res) for one_res in res]
+                    for one_res in res:
+                        await session.delete(one_res)
 
                 if not res:
                     return False
 
-                # await session.delete(res)
-                await session.commit()
-                get_logger().info(
-                    f"DATA DELETED: {self.model.__name__} with data: {args}, {kwargs}"
-                )
+                await self._commit(session, self._tags(rows))
+                self._log(logging.INFO, "DATA DELETED", filters=kwargs)
                 return True
             except Exception as e:
-                await session.rollback()
-                get_logger().info(
-                    f"DATA NOT DELETED: {self.model.__name__} with data: {args}, {kwargs}"
-                )
+                await self._rollback(session)
+                self._log(logging.INFO, "DATA NOT DELETED", filters=kwargs, error=e)
                 raise Exception(f"Delete Error in {self.model.__class__.__name__}: {e}")
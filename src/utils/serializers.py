@@ -0,0 +1,117 @@
+import json
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+import msgpack
+
+from config import config_setting
+
+
+# First byte of every stored value.
+RAW = b"r"
+ZLIB = b"z"
+
+
+class AbstractSerializer(ABC):
+    """
+    Turns cached values into bytes and back. Payloads longer than
+    ``compress_threshold`` bytes are zlib-compressed; a one-byte header
+    records which form was stored.
+    """
+
+    def __init__(
+        self, compress_threshold: Optional[int] = None, compress_level: int = 1
+    ) -> None:
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    @abstractmethod
+    def encode(self, data: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, payload: bytes) -> Any:
+        pass
+
+    def dumps(self, data: Any) -> bytes:
+        payload = self.encode(data)
+        if self.compress_threshold and len(payload) > self.compress_threshold:
+            return ZLIB + zlib.compress(payload, self.compress_level)
+        return RAW + payload
+
+    def loads(self, data: Optional[bytes]) -> Any:
+        if not data:
+            return None
+        header, payload = data[:1], data[1:]
+        if header == RAW:
+            return self.decode(payload)
+        if header == ZLIB:
+            return self.decode(zlib.decompress(payload))
+        # Written before values carried a header.
+        return json.loads(data)
+
+
+class JsonSerializer(AbstractSerializer):
+    """JSON with UUID, datetime and Decimal flattened to strings."""
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, default=str).encode()
+
+    def decode(self, payload: bytes) -> Any:
+        return json.loads(payload)
+
+
+class MsgpackSerializer(AbstractSerializer):
+    """msgpack; UUID, datetime, date and Decimal come back as the same types."""
+
+    UUID = 1
+    DATETIME = 2
+    DATE = 3
+    DECIMAL = 4
+
+    @classmethod
+    def _default(cls, value: Any) -> msgpack.ExtType:
+        if isinstance(value, uuid.UUID):
+            return msgpack.ExtType(cls.UUID, value.bytes)
+        if isinstance(value, datetime):
+            return msgpack.ExtType(cls.DATETIME, value.isoformat().encode())
+        if isinstance(value, date):
+            return msgpack.ExtType(cls.DATE, value.isoformat().encode())
+        if isinstance(value, Decimal):
+            return msgpack.ExtType(cls.DECIMAL, str(value).encode())
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    @classmethod
+    def _ext_hook(cls, code: int, data: bytes) -> Any:
+        if code == cls.UUID:
+            return uuid.UUID(bytes=data)
+        if code == cls.DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == cls.DATE:
+            return date.fromisoformat(data.decode())
+        if code == cls.DECIMAL:
+            return Decimal(data.decode())
+        return msgpack.ExtType(code, data)
+
+    def encode(self, data: Any) -> bytes:
+        return msgpack.packb(data, default=self._default, use_bin_type=True)
+
+    def decode(self, payload: bytes) -> Any:
+        return msgpack.unpackb(payload, ext_hook=self._ext_hook, raw=False)
+
+
+SERIALIZERS = {
+    "json": JsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+def get_serializer() -> AbstractSerializer:
+    return SERIALIZERS[config_setting.CACHE_SERIALIZER](
+        compress_threshold=config_setting.CACHE_COMPRESS_THRESHOLD,
+        compress_level=config_setting.CACHE_COMPRESS_LEVEL,
+    )
@@ -0,0 +1,250 @@
+import asyncio
+import copy
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from utils.cache_manager import AbstractCache, AbstractPipeline
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+class LRUCache:
+    """Size- and TTL-bounded in-process cache with least-recently-used eviction."""
+
+    def __init__(self, max_size: int, ttl: float, name: str = "cache_l1") -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.name = name
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        get_metrics().gauge(f"{name}_size", lambda: len(self._data))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            get_metrics().incr(f"{self.name}_misses")
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            get_metrics().incr(f"{self.name}_misses")
+            return default
+        self._data.move_to_end(key)
+        get_metrics().incr(f"{self.name}_hits")
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            get_metrics().incr(f"{self.name}_evictions")
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisInvalidationBus:
+    """
+    Broadcasts invalidated keys over Redis pub/sub so every worker drops them
+    from its L1. One message per batch, ``<node id>:<JSON list of keys>``; a
+    worker ignores its own.
+    """
+
+    def __init__(self, redis, channel: str = "cache:invalidate") -> None:
+        self.redis = redis
+        self.channel = channel
+        self.node_id = uuid.uuid4().hex
+
+    async def publish(self, keys: list[str]) -> None:
+        await self.redis.publish(self.channel, f"{self.node_id}:{json.dumps(keys)}")
+
+    async def listen(self, on_invalidate, on_disconnect) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        data = message["data"]
+                        if isinstance(data, bytes):
+                            data = data.decode()
+                        origin, _, keys = data.partition(":")
+                        if origin != self.node_id:
+                            for key in json.loads(keys):
+                                on_invalidate(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Messages may have been missed while disconnected.
+                on_disconnect()
+                get_logger().warning("Cache invalidation listener error: %s", e)
+                await asyncio.sleep(1)
+
+
+class TieredPipeline(AbstractPipeline):
+    def __init__(self, cache: "TieredCache") -> None:
+        self.cache = cache
+        self.pipe = cache.backend.pipeline()
+        self.touched: list[str] = []
+
+    def set(self, token: str, data: Any, exp: Optional[int] = None):
+        self.pipe.set(token, data, exp)
+        self.touched.append(token)
+        return self
+
+    def get(self, token: str):
+        self.pipe.get(token)
+        return self
+
+    def delete(self, token: str):
+        self.pipe.delete(token)
+        self.touched.append(token)
+        return self
+
+    async def execute(self) -> list:
+        results = await self.pipe.execute()
+        await self.cache.invalidate(self.touched)
+        return results
+
+
+class TieredCache(AbstractCache):
+    """
+    In-process L1 in front of another AbstractCache (L2). Reads are served
+    from L1 while fresh; writes and deletes go to L2 first, then drop the key
+    from L1 here and, through the invalidation bus, on every other worker.
+    L1 entries live at most ``ttl`` seconds, which bounds staleness for keys
+    that expire in L2 without being written.
+
+    A key invalidated while its L2 read is in flight may have been read
+    before the write; such a read is returned but not stored in L1.
+    """
+
+    def __init__(
+        self,
+        backend: AbstractCache,
+        max_size: int,
+        ttl: float,
+        bus: Optional[RedisInvalidationBus] = None,
+    ) -> None:
+        self.backend = backend
+        self.l1 = LRUCache(max_size=max_size, ttl=ttl)
+        self.bus = bus
+        self._listener: Optional[asyncio.Task] = None
+        # Keys with L2 reads in flight -> [readers, invalidation generation].
+        self._reads: dict[str, list[int]] = {}
+        # Bumped when all of L1 is dropped.
+        self._epoch = 0
+
+    async def start(self) -> None:
+        if self.bus is not None and self._listener is None:
+            self._listener = asyncio.create_task(
+                self.bus.listen(self._drop, self._drop_all)
+            )
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.backend.close()
+
+    def _drop(self, token: str) -> None:
+        self.l1.delete(token)
+        read = self._reads.get(token)
+        if read is not None:
+            read[1] += 1
+
+    def _drop_all(self) -> None:
+        self.l1.clear()
+        self._epoch += 1
+
+    async def _fetch(self, tokens: list[str]) -> list:
+        """Read ``tokens`` from L2 and store them in L1 unless invalidated meanwhile."""
+        epoch = self._epoch
+        reads = [self._reads.setdefault(token, [0, 0]) for token in tokens]
+        generations = []
+        for read in reads:
+            read[0] += 1
+            generations.append(read[1])
+        try:
+            values = await self.backend.mget(tokens)
+        finally:
+            for token, read in zip(tokens, reads):
+                read[0] -= 1
+                if not read[0]:
+                    del self._reads[token]
+        for token, read, generation, value in zip(tokens, reads, generations, values):
+            if value is None:
+                continue
+            if read[1] == generation and self._epoch == epoch:
+                self.l1.set(token, value)
+            else:
+                get_metrics().incr("cache_l1_stale_fills")
+        return values
+
+    async def invalidate(self, tokens: list[str]) -> None:
+        for token in tokens:
+            self._drop(token)
+        if self.bus is not None and tokens:
+            await self.bus.publish(tokens)
+
+    async def set(self, token: str, data: dict, exp: Optional[int] = None) -> str:
+        result = await self.backend.set(token=token, data=data, exp=exp)
+        await self.invalidate([token])
+        return result
+
+    async def get(self, token: str) -> dict:
+        missing = object()
+        value = self.l1.get(token, missing)
+        if value is missing:
+            (value,) = await self._fetch([token])
+        # Callers mutate what they get back; never hand out the cached object.
+        return copy.deepcopy(value)
+
+    async def delete(self, token: str) -> bool:
+        result = await self.backend.delete(token=token)
+        await self.invalidate([token])
+        return result
+
+    async def set_if_absent(
+        self, token: str, data: Any, exp: Optional[int] = None
+    ) -> bool:
+        written = await self.backend.set_if_absent(token=token, data=data, exp=exp)
+        if written:
+            await self.invalidate([token])
+        return written
+
+    async def incr(self, token: str, amount: int = 1, exp: Optional[int] = None) -> int:
+        value = await self.backend.incr(token=token, amount=amount, exp=exp)
+        await self.invalidate([token])
+        return value
+
+    async def mset_with_ttl(self, items: dict[str, Any], exp: Optional[int]) -> None:
+        await self.backend.mset_with_ttl(items=items, exp=exp)
+        await self.invalidate(list(items))
+
+    async def mget(self, tokens: list[str]) -> list:
+        missing = object()
+        values = [self.l1.get(token, missing) for token in tokens]
+        absent = [token for token, value in zip(tokens, values) if value is missing]
+        if absent:
+            fetched = dict(zip(absent, await self._fetch(absent)))
+            values = [
+                fetched[token] if value is missing else value
+                for token, value in zip(tokens, values)
+            ]
+        return copy.deepcopy(values)
+
+    def pipeline(self) -> TieredPipeline:
+        return TieredPipeline(self)
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from database import current_session, primary_pinned
+from utils import cache_aside
+from utils.cache_aside import cached, invalidate_tags
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, token, data, exp=None):
+        self.data[token] = data
+        return token
+
+    async def mget(self, tokens):
+        return [self.data.get(token) for token in tokens]
+
+    async def mset_with_ttl(self, items, exp):
+        self.data.update(items)
+
+
+@pytest.fixture
+def cache():
+    fake = FakeCache()
+    with patch.object(cache_aside, "get_cache_manager", return_value=fake):
+        yield fake
+
+
+def test_second_call_is_served_from_cache(cache):
+    calls = []
+
+    @cached("user:{user_id}", tags=["user:{user_id}"])
+    async def load(user_id):
+        calls.append(user_id)
+        return {"id": user_id}
+
+    async def run():
+        return [await load(1), await load(user_id=1), await load(2)]
+
+    assert asyncio.run(run()) == [{"id": 1}, {"id": 1}, {"id": 2}]
+    assert calls == [1, 2]
+
+
+def test_invalidating_a_tag_drops_entries(cache):
+    calls = []
+
+    @cached("user:{user_id}", tags=["user:{user_id}"])
+    async def load(user_id):
+        calls.append(user_id)
+        return {"id": user_id, "version": len(calls)}
+
+    async def run():
+        await load(1)
+        await invalidate_tags(["user:1"])
+        return await load(1)
+
+    assert asyncio.run(run()) == {"id": 1, "version": 2}
+
+
+def test_value_loaded_during_invalidation_is_not_served(cache):
+    calls = []
+
+    @cached("user:{user_id}", tags=["user:{user_id}"])
+    async def load(user_id):
+        calls.append(user_id)
+        if len(calls) == 1:
+            # A write lands while the first read is still loading.
+            await invalidate_tags(["user:1"])
+        return {"version": len(calls)}
+
+    async def run():
+        return [await load(1), await load(1), await load(1)]
+
+    assert asyncio.run(run()) == [{"version": 1}, {"version": 2}, {"version": 2}]
+
+
+def test_falsy_results_are_not_cached(cache):
+    calls = []
+
+    @cached("user:{user_id}")
+    async def load(user_id):
+        calls.append(user_id)
+        return False
+
+    async def run():
+        await load(1)
+        await load(1)
+
+    asyncio.run(run())
+    assert calls == [1, 1]
+
+
+def test_concurrent_misses_share_one_load(cache):
+    calls = []
+
+    @cached("catalog:{page}")
+    async def load(page):
+        calls.append(page)
+        await asyncio.sleep(0.01)
+        return {"page": page}
+
+    async def run():
+        return await asyncio.gather(*(load(1) for _ in range(20)))
+
+    assert asyncio.run(run()) == [{"page": 1}] * 20
+    assert calls == [1]
+
+
+def test_shared_load_does_not_see_the_callers_session(cache):
+    seen = []
+
+    @cached("catalog:{page}")
+    async def load(page):
+        seen.append(current_session.get())
+        return {"page": page}
+
+    async def run():
+        current_session.set(SimpleNamespace(info={}))
+        return await load(1)
+
+    assert asyncio.run(run()) == {"page": 1}
+    assert seen == [None]
+
+
+def test_shared_load_keeps_the_primary_pin(cache):
+    seen = []
+
+    @cached("user:{user_id}")
+    async def load(user_id):
+        await asyncio.sleep(0.01)
+        seen.append(primary_pinned.get())
+        return {"id": user_id}
+
+    async def after_a_write():
+        primary_pinned.set(True)
+        return await load(1)
+
+    async def run():
+        # A pinned request does not join a refill started by an unpinned one.
+        return await asyncio.gather(load(1), asyncio.create_task(after_a_write()))
+
+    assert asyncio.run(run()) == [{"id": 1}, {"id": 1}]
+    assert sorted(seen) == [False, True]
+
+
+def test_entries_near_expiry_are_refreshed_early(cache):
+    calls = []
+
+    @cached("catalog:{page}", ttl=60)
+    async def load(page):
+        calls.append(page)
+        return {"version": len(calls)}
+
+    async def run():
+        await load(1)
+        entry = cache.data["cache:catalog:1"]
+        entry["delta"], entry["expiry"] = 1.0, time.time()
+        return await load(1)
+
+    assert asyncio.run(run()) == {"version": 2}
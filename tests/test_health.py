@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.v1.dependencies import get_current_user
+from api.v1.endpoints import health
+
+
+def client_as(user: dict) -> TestClient:
+    app = FastAPI()
+    app.include_router(health.router)
+    app.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(app)
+
+
+def test_metrics_are_for_admins_only():
+    admin = client_as({"id": 1, "role_id": 1}).get("/health/metrics")
+    user = client_as({"id": 2, "role_id": 2}).get("/health/metrics")
+
+    assert admin.status_code == 200
+    assert "counters" in admin.json()
+    assert user.status_code == 403
+
+
+def test_metrics_need_a_token():
+    app = FastAPI()
+    app.include_router(health.router)
+
+    assert TestClient(app).get("/health/metrics").status_code == 401
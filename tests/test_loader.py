@@ -0,0 +1,71 @@
+import asyncio
+
+from utils.loader import RepositoryLoader, get_loader, loader_scope
+
+
+class FakeRepository:
+    model = "FakeModel"
+    pk_name = "id"
+
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+        self.calls = []
+
+    async def get_many(self, keys, use_loader=True):
+        self.calls.append(list(keys))
+        return [self.rows[key] for key in keys if key in self.rows]
+
+
+def test_concurrent_loads_are_batched_into_one_query():
+    repo = FakeRepository([{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+    loader = RepositoryLoader(repo)
+
+    async def run():
+        return await asyncio.gather(loader.load(1), loader.load(2), loader.load(3))
+
+    assert asyncio.run(run()) == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}, False]
+    assert repo.calls == [[1, 2, 3]]
+
+
+def test_results_are_memoised_until_cleared():
+    repo = FakeRepository([{"id": 1, "name": "a"}])
+    loader = RepositoryLoader(repo)
+
+    async def run():
+        first = await loader.load(1)
+        first["name"] = "changed"
+        second = await loader.load(1)
+        loader.clear()
+        await loader.load(1)
+        return second
+
+    assert asyncio.run(run()) == {"id": 1, "name": "a"}
+    assert repo.calls == [[1], [1]]
+
+
+def test_get_loader_is_scoped():
+    repo = FakeRepository([])
+
+    async def run():
+        assert get_loader(repo) is None
+        async with loader_scope():
+            loader = get_loader(repo)
+            assert loader is get_loader(repo)
+        assert get_loader(repo) is None
+
+    asyncio.run(run())
+
+
+def test_cancelling_the_first_caller_still_dispatches_the_batch():
+    repo = FakeRepository([{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+    loader = RepositoryLoader(repo)
+
+    async def run():
+        first = asyncio.create_task(loader.load(1))
+        others = asyncio.gather(loader.load(1), loader.load(2))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await asyncio.wait_for(others, timeout=1)
+
+    assert asyncio.run(run()) == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+    assert repo.calls == [[1, 2]]
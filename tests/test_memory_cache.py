@@ -0,0 +1,51 @@
+import asyncio
+import uuid
+from unittest.mock import patch
+
+from utils.memory_cache import MemoryCache
+
+
+def test_values_round_trip_and_expire():
+    cache = MemoryCache(max_size=10)
+    user_id = uuid.uuid4()
+
+    async def run():
+        await cache.set("user", {"id": user_id}, exp=60)
+        await cache.set("short", {"id": 1}, exp=1)
+        with patch("utils.memory_cache.time.monotonic", return_value=10**9):
+            expired = await cache.get("short")
+        return await cache.get("user"), expired
+
+    assert asyncio.run(run()) == ({"id": user_id}, None)
+
+
+def test_least_recently_used_key_is_evicted():
+    cache = MemoryCache(max_size=2)
+
+    async def run():
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+        return await cache.mget(["a", "b", "c"])
+
+    assert asyncio.run(run()) == [1, None, 3]
+
+
+def test_counters_set_if_absent_and_pipeline():
+    cache = MemoryCache(max_size=10)
+
+    async def run():
+        counts = [await cache.incr("hits", exp=60) for _ in range(3)]
+        first = await cache.set_if_absent("lock", 1, exp=10)
+        second = await cache.set_if_absent("lock", 1, exp=10)
+        results = await (
+            cache.pipeline().set("k", {"v": 1}).get("k").delete("k").get("k").execute()
+        )
+        return counts, first, second, results, await cache.get("hits")
+
+    counts, first, second, results, hits = asyncio.run(run())
+    assert counts == [1, 2, 3]
+    assert (first, second) == (True, False)
+    assert results == [True, {"v": 1}, 1, None]
+    assert hits == 3
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.security import PasswordHasher, PasswordHasherBusy
+from utils.metrics import get_metrics
+
+
+def gauges() -> tuple:
+    snapshot = get_metrics().snapshot()["gauges"]
+    return snapshot["password_hash_in_flight"], snapshot["password_hash_queue_depth"]
+
+
+def test_calls_over_the_limit_are_shed_with_503():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    release = threading.Event()
+    rejected = get_metrics().snapshot()["counters"].get("password_hash_rejected", 0)
+
+    async def run():
+        # One call hashing, one queued behind it: the hasher is full.
+        running = [
+            asyncio.create_task(hasher.run(release.wait)) for _ in range(hasher.limit)
+        ]
+        await asyncio.sleep(0)
+        saturated = gauges()
+        with pytest.raises(PasswordHasherBusy) as busy:
+            await hasher.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        return saturated, busy.value
+
+    try:
+        saturated, busy = asyncio.run(run())
+    finally:
+        release.set()
+        hasher.shutdown()
+
+    assert saturated == (2, 1)
+    assert busy.status_code == 503
+    assert busy.headers == {"Retry-After": "1"}
+    assert (
+        get_metrics().snapshot()["counters"]["password_hash_rejected"] == rejected + 1
+    )
+    assert gauges() == (0, 0)
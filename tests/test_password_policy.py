@@ -0,0 +1,61 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import HTTPException
+
+from core.password_policy import build_crypt_context
+from services.auth_service import AuthService
+
+
+def context(rounds: int):
+    return build_crypt_context(
+        scheme="bcrypt",
+        bcrypt_rounds=rounds,
+        argon2_memory_cost=8192,
+        argon2_time_cost=1,
+        argon2_parallelism=1,
+    )
+
+
+def test_hashes_with_another_cost_are_updated_on_verify():
+    old_hash = context(4).hash("secret")
+    policy = context(5)
+
+    assert policy.verify_and_update("wrong", old_hash) == (False, None)
+    valid, new_hash = policy.verify_and_update("secret", old_hash)
+    assert valid and new_hash.startswith("$2b$05$")
+    assert policy.verify_and_update("secret", new_hash) == (True, None)
+
+
+def test_login_rehashes_out_of_policy_hashes_in_the_background():
+    user = {"id": 1, "email": "a@b.c", "hash_password": "old"}
+    user_repo = MagicMock(
+        get=AsyncMock(return_value=user), update=AsyncMock(return_value=user)
+    )
+    security = MagicMock(
+        verify_and_update=AsyncMock(return_value=(True, "new")),
+        create_access_token=AsyncMock(return_value="access"),
+        create_refresh_token=AsyncMock(return_value=("refresh", None)),
+    )
+    refresh_repo = MagicMock(
+        insert=AsyncMock(return_value={"refresh_token": "refresh"})
+    )
+    service = AuthService(
+        user_repo=lambda: user_repo,
+        refresh_repo=lambda: refresh_repo,
+        cache_manager=MagicMock,
+        email_manager=MagicMock,
+        security_layer=lambda: security,
+        error_handler=HTTPException,
+        template_handler=None,
+    )
+
+    async def run():
+        tokens = await service.login_handler(data={"email": "a@b.c", "password": "x"})
+        await asyncio.gather(*service._background_tasks)
+        return tokens
+
+    assert asyncio.run(run())["access_token"] == "access"
+    user_repo.update.assert_awaited_once_with(
+        id=1, hash_password="old", data={"hash_password": "new"}
+    )
@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from api.v1.endpoints.product import compare_products
+from database import Base
+from models import location_model, user_model  # noqa: F401  (tables for create_all)
+from models.product_model import Brand, Category, Feature, Product, Review, Subcategory
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'catalog.db'}", poolclass=NullPool
+    )
+    session_maker = async_sessionmaker(
+        engine, expire_on_commit=False, class_=AsyncSession
+    )
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_maker() as session:
+            session.add_all(
+                [
+                    Category(category_id=1, name="c", description="c"),
+                    Subcategory(
+                        subcategory_id=1, name="s", description="s", category_id=1
+                    ),
+                    Brand(brand_id=1, name="Acme", description="b"),
+                ]
+                + [
+                    Product(
+                        product_id=i,
+                        name=f"product {i}",
+                        description="d",
+                        small_description="d",
+                        price=10 * i,
+                        availability=True,
+                        currency="UAH",
+                        in_stock=True,
+                        category_id=1,
+                        subcategory_id=1,
+                        product_image=f"https://img/{i}.png",
+                        brand_id=1 if i == 1 else None,
+                    )
+                    for i in (1, 2)
+                ]
+                + [
+                    Feature(
+                        feature_id=1,
+                        product_id=1,
+                        feature_name="w",
+                        feature_text="1 kg",
+                    ),
+                    Review(review_id=1, product_id=1, rating=4, review_text="ok"),
+                    Review(review_id=2, product_id=1, rating=5, review_text="good"),
+                ]
+            )
+            await session.commit()
+
+    asyncio.run(create())
+    with patch("utils.repository.read_session", session_maker):
+        yield
+
+
+def test_compared_products_carry_features_rating_brand_and_image(catalog):
+    first, second = sorted(
+        asyncio.run(compare_products([1, 2])), key=lambda p: p.product_id
+    )
+
+    assert [f.feature_text for f in first.features] == ["1 kg"]
+    assert first.average_rating == 4.5
+    assert first.brand_name == "Acme"
+    assert first.image_url == "https://img/1.png"
+    assert (second.features, second.average_rating, second.brand_name) == (
+        [],
+        0.0,
+        None,
+    )
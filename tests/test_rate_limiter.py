@@ -0,0 +1,51 @@
+import asyncio
+from unittest.mock import patch
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from utils import rate_limiter
+from utils.rate_limiter import MemoryRateLimiter, RateLimit
+
+
+class LoginSchema(BaseModel):
+    email: str
+
+
+app = FastAPI()
+
+
+@app.post(
+    "/login",
+    dependencies=[
+        Depends(RateLimit("login", limit=2, window=60, by="email")),
+        Depends(RateLimit("login", limit=3, window=60, by="ip")),
+    ],
+)
+async def login(data: LoginSchema) -> str:
+    return data.email
+
+
+def test_requests_over_the_limit_get_429_with_retry_after():
+    limiter = MemoryRateLimiter(max_keys=100)
+    client = TestClient(app)
+
+    with patch.object(rate_limiter, "get_rate_limiter", return_value=limiter):
+        responses = [
+            client.post("/login", json={"email": email})
+            for email in ("A@x.io", "a@x.io", "a@x.io", "b@x.io", "c@x.io")
+        ]
+
+    assert [r.status_code for r in responses] == [200, 200, 429, 200, 429]
+    assert responses[2].headers["Retry-After"] == "60"
+
+
+def test_window_slides():
+    limiter = MemoryRateLimiter(max_keys=100)
+
+    async def run():
+        with patch("utils.rate_limiter.time.monotonic", side_effect=[0, 1, 2, 10.5]):
+            return [await limiter.hit("k", limit=2, window=10) for _ in range(4)]
+
+    assert asyncio.run(run()) == [None, None, 8, None]
@@ -0,0 +1,37 @@
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from utils.serializers import JsonSerializer, MsgpackSerializer
+
+
+def test_msgpack_preserves_types():
+    serializer = MsgpackSerializer()
+    data = {
+        "id": uuid.uuid4(),
+        "created_at": datetime.now(timezone.utc),
+        "birth_date": date(1990, 1, 1),
+        "price": Decimal("499.90"),
+        "tags": ["a", "b"],
+        "count": 0,
+    }
+
+    assert serializer.loads(serializer.dumps(data)) == data
+
+
+def test_large_payloads_are_compressed():
+    serializer = MsgpackSerializer(compress_threshold=64)
+    data = {"description": "x" * 1000}
+    encoded = serializer.dumps(data)
+
+    assert encoded[:1] == b"z"
+    assert len(encoded) < 100
+    assert serializer.loads(encoded) == data
+
+
+def test_values_written_before_headers_are_still_readable():
+    legacy = json.dumps({"id": "1", "count": 0}).encode()
+
+    assert JsonSerializer().loads(legacy) == {"id": "1", "count": 0}
+    assert MsgpackSerializer().loads(legacy) == {"id": "1", "count": 0}
@@ -0,0 +1,251 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Mapped, declarative_base, mapped_column
+from sqlalchemy.pool import NullPool
+
+from utils import cache_aside
+from utils.loader import loader_scope
+from utils.repository import SqlLayer
+
+pytest.importorskip("aiosqlite")
+
+Base = declarative_base()
+
+
+class ItemModel(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    sku: Mapped[str] = mapped_column(unique=True)
+    name: Mapped[str] = mapped_column()
+    kind: Mapped[str] = mapped_column(default="plain")
+
+    async def to_dict(self):
+        return {"id": self.id, "sku": self.sku, "name": self.name, "kind": self.kind}
+
+
+class ItemRepository(SqlLayer):
+    model = ItemModel
+
+
+class CachedItemRepository(ItemRepository):
+    cache_ttl = 60
+    cache_exclude = ("sku",)
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+        self.calls = 0
+
+    async def set(self, token, data, exp=None):
+        self.calls += 1
+        self.data[token] = data
+
+    async def mget(self, tokens):
+        self.calls += 1
+        return [self.data.get(token) for token in tokens]
+
+    async def mset_with_ttl(self, items, exp):
+        self.calls += 1
+        self.data.update(items)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'items.db'}", poolclass=NullPool
+    )
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    return engine
+
+
+@pytest.fixture
+def items(engine):
+    session_maker = async_sessionmaker(
+        engine, expire_on_commit=False, class_=AsyncSession
+    )
+    with patch("utils.repository.async_session_maker", session_maker), patch(
+        "utils.repository.read_session", session_maker
+    ):
+        yield ItemRepository()
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements run on ``engine``, in order."""
+    seen = []
+
+    def record(conn, cursor, statement, *args):
+        seen.append(statement.split()[0])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def rows(count, kind="plain"):
+    return [
+        {"id": i, "sku": f"sku-{i}", "name": f"item {i}", "kind": kind}
+        for i in range(1, count + 1)
+    ]
+
+
+def test_get_by_an_impossible_primary_key_finds_nothing(items):
+    async def run():
+        await items.insert_many(rows(1))
+        return [
+            await items.get(id=None),
+            await items.get(id="garbage"),
+            await items.get(id="1"),
+        ]
+
+    assert asyncio.run(run()) == [False, False, rows(1)[0]]
+
+
+def test_repeated_cached_gets_in_a_request_skip_the_cache(items):
+    repo, cache = CachedItemRepository(), FakeCache()
+
+    async def run():
+        await items.insert_many(rows(1))
+        async with loader_scope():
+            first = await repo.get(id=1)
+            calls = cache.calls
+            again = [await repo.get(id=1) for _ in range(3)]
+        return first, calls, again
+
+    with patch.object(cache_aside, "get_cache_manager", return_value=cache):
+        first, calls, again = asyncio.run(run())
+
+    assert first == {"id": 1, "name": "item 1", "kind": "plain"}
+    assert again == [first] * 3
+    assert cache.data["cache:items:1"]["value"] == first
+    assert cache.calls == calls
+
+
+def test_set_based_update_changes_one_row(items):
+    async def run():
+        await items.insert_many(rows(3))
+        updated = await items.update({"name": "renamed"}, id=2)
+        missing = await items.update({"name": "renamed"}, id=99)
+        with pytest.raises(Exception, match="Update Error"):
+            await items.update({"name": "renamed"}, kind="plain")
+        return updated, missing, await items.get_all()
+
+    updated, missing, after = asyncio.run(run())
+    assert updated == {**rows(3)[1], "name": "renamed"}
+    assert missing is False
+    # The multi-row update was rolled back.
+    assert [row["name"] for row in after] == ["item 1", "renamed", "item 3"]
+
+
+def test_set_based_delete_removes_every_match(items):
+    async def run():
+        await items.insert_many(
+            rows(2) + [{"id": 3, "sku": "sku-3", "name": "c", "kind": "rare"}]
+        )
+        deleted = await items.delete(id=3)
+        missing = await items.delete(id=99)
+        deleted_all = await items.delete(kind="plain")
+        return deleted, missing, deleted_all, await items.get_all()
+
+    assert asyncio.run(run()) == (True, False, True, [])
+
+
+def test_insert_many_writes_one_statement_per_chunk(items, statements):
+    async def run():
+        inserted = await items.insert_many(rows(5), chunk_size=2)
+        inserts = statements.count("INSERT")
+        more = [
+            {"id": 6, "sku": "sku-6", "name": "item 6", "kind": "plain"},
+            {"id": 7, "sku": "sku-7", "name": "item 7", "kind": "plain"},
+        ]
+        count = await items.insert_many(more, returning=False)
+        return inserted, inserts, count, await items.get_all()
+
+    inserted, inserts, count, after = asyncio.run(run())
+    assert inserted == rows(5)
+    assert inserts == 3
+    assert count == 2
+    assert len(after) == 7
+
+
+def test_upsert_many_updates_conflicting_rows(items):
+    changes = [
+        {"id": 2, "sku": "sku-2", "name": "renamed"},
+        {"id": 4, "sku": "sku-4", "name": "item 4"},
+    ]
+
+    async def run():
+        await items.insert_many(rows(3))
+        upserted = await items.upsert_many(
+            changes, conflict_cols=["sku"], update_cols=["name"], chunk_size=1
+        )
+        # Without RETURNING the count is of rows sent, skipped or not.
+        sent = await items.upsert_many(
+            [{"id": 5, "sku": "sku-1", "name": "ignored"}],
+            conflict_cols=["sku"],
+            update_cols=[],
+            returning=False,
+        )
+        return upserted, sent, await items.get_all()
+
+    upserted, sent, after = asyncio.run(run())
+    assert [row["name"] for row in upserted] == ["renamed", "item 4"]
+    assert sent == 1
+    assert [(row["id"], row["name"]) for row in after] == [
+        (1, "item 1"),
+        (2, "renamed"),
+        (3, "item 3"),
+        (4, "item 4"),
+    ]
+
+
+def test_iter_all_walks_keyset_pages(items, statements):
+    async def collect(**kwargs):
+        start = statements.count("SELECT")
+        found = [row["id"] async for row in items.iter_all(batch_size=2, **kwargs)]
+        return found, statements.count("SELECT") - start
+
+    async def run():
+        await items.insert_many(rows(5))
+        # Gaps in the keys and rows the filter skips between pages.
+        await items.insert_many(
+            [{"id": i, "sku": f"sku-{i}", "name": "r", "kind": "rare"} for i in (7, 9)]
+        )
+        await items.delete(id=3)
+        return await collect(kind="plain"), await collect(), await collect(id=99)
+
+    plain, every, none = asyncio.run(run())
+    # A full last page costs one more, empty, page.
+    assert plain == ([1, 2, 4, 5], 3)
+    assert every == ([1, 2, 4, 5, 7, 9], 4)
+    assert none == ([], 1)
+
+
+def test_projected_get_and_exists(items):
+    async def run():
+        await items.insert_many(rows(2))
+        return (
+            await items.get(id=1, columns=["id", "name"]),
+            await items.get(sku="sku-2", columns=["kind"]),
+            await items.get(id=99, columns=["id"]),
+            await items.exists(sku="sku-1"),
+            await items.exists(sku="sku-1", kind="rare"),
+        )
+
+    projected, by_sku, missing, found, absent = asyncio.run(run())
+    assert projected == {"id": 1, "name": "item 1"}
+    assert type(projected) is dict
+    assert by_sku == {"kind": "plain"}
+    assert missing is False
+    assert (found, absent) == (True, False)
@@ -0,0 +1,121 @@
+import asyncio
+
+from utils.tiered_cache import LRUCache, RedisInvalidationBus, TieredCache
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+        self.gets = 0
+
+    async def set(self, token, data, exp=None):
+        self.data[token] = data
+        return token
+
+    async def get(self, token):
+        self.gets += 1
+        return self.data.get(token)
+
+    async def delete(self, token):
+        self.data.pop(token, None)
+
+    async def mset_with_ttl(self, items, exp):
+        self.data.update(items)
+
+    async def mget(self, tokens):
+        self.gets += 1
+        return [self.data.get(token) for token in tokens]
+
+    async def close(self):
+        pass
+
+
+class FakeBus:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, keys):
+        self.published.extend(keys)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl=60, name="test_lru")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_reads_are_served_from_l1_and_writes_invalidate():
+    backend, bus = FakeCache(), FakeBus()
+    cache = TieredCache(backend=backend, max_size=10, ttl=60, bus=bus)
+
+    async def run():
+        await cache.set("k", {"count": 1})
+        first = await cache.get("k")
+        first["count"] += 1
+        second = await cache.get("k")
+        await cache.set("k", {"count": 5})
+        third = await cache.get("k")
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert second == {"count": 1}
+    assert third == {"count": 5}
+    assert backend.gets == 2
+    assert bus.published == ["k", "k"]
+
+
+def test_mget_fetches_only_missing_keys():
+    backend = FakeCache()
+    backend.data.update({"a": 1, "b": 2})
+    cache = TieredCache(backend=backend, max_size=10, ttl=60)
+
+    async def run():
+        await cache.get("a")
+        return await cache.mget(["a", "b", "c"])
+
+    assert asyncio.run(run()) == [1, 2, None]
+    assert backend.gets == 2
+
+
+def test_read_racing_an_invalidation_is_not_stored_in_l1():
+    backend = FakeCache()
+    backend.data["k"] = "old"
+    cache = TieredCache(backend=backend, max_size=10, ttl=60)
+    fetch = backend.mget
+
+    async def slow_mget(tokens):
+        values = await fetch(tokens)
+        # Another worker writes "k" after L2 answered but before L1 is filled.
+        backend.data["k"] = "new"
+        cache._drop("k")
+        return values
+
+    async def run():
+        backend.mget = slow_mget
+        first = await cache.get("k")
+        backend.mget = fetch
+        return first, await cache.get("k")
+
+    assert asyncio.run(run()) == ("old", "new")
+    assert backend.gets == 2
+
+
+def test_invalidation_bus_publishes_one_message_per_batch():
+    class FakeRedis:
+        def __init__(self):
+            self.messages = []
+
+        async def publish(self, channel, message):
+            self.messages.append(message)
+
+    redis = FakeRedis()
+    bus = RedisInvalidationBus(redis)
+    asyncio.run(bus.publish(["a", "b:c"]))
+
+    assert redis.messages == [f'{bus.node_id}:["a", "b:c"]']
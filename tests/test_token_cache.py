@@ -0,0 +1,30 @@
+import asyncio
+from unittest.mock import patch
+
+import jwt
+
+from config import config_setting
+from core import tokens
+from core.security import JWTAuth
+
+
+def test_verified_claims_are_reused_until_the_token_expires(monkeypatch):
+    # CI runs with placeholder JWT settings; sign with a real algorithm here.
+    monkeypatch.setattr(config_setting, "ALGORITHM", "HS256")
+    monkeypatch.setattr(config_setting, "SECRET_KEY", "test-secret-" + "x" * 32)
+    monkeypatch.setattr(tokens, "_token_codec", None)
+    auth = JWTAuth()
+
+    async def run():
+        token = await auth.create_access_token(data={"id": "42"})
+        with patch("core.tokens.jwt.decode", wraps=jwt.decode) as decode:
+            first = await auth.decode_token(token=token)
+            first["id"] = "tampered"
+            second = await auth.decode_token(token=token)
+            with patch("utils.tiered_cache.time.monotonic", return_value=10**9):
+                await auth.decode_token(token=token)
+        return second, decode.call_count
+
+    claims, decodes = asyncio.run(run())
+    assert claims["id"] == "42"
+    assert decodes == 2
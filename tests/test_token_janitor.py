@@ -0,0 +1,31 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services import token_janitor
+from services.token_janitor import TokenJanitor
+
+
+class FakeSession:
+    def __init__(self, rowcount):
+        self.execute = AsyncMock(return_value=MagicMock(rowcount=rowcount))
+        self.commit = AsyncMock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_expired_tokens_are_purged_in_rate_limited_batches():
+    janitor = TokenJanitor(batch_size=2, max_rows_per_second=20, interval=60)
+    sessions = [FakeSession(2), FakeSession(2), FakeSession(1)]
+    sleep = AsyncMock()
+
+    with patch.object(token_janitor, "async_session_maker", side_effect=sessions):
+        with patch.object(token_janitor.asyncio, "sleep", sleep):
+            purged = asyncio.run(janitor.purge_expired())
+
+    assert purged == 5
+    assert all(session.commit.await_count == 1 for session in sessions)
+    assert [call.args for call in sleep.await_args_list] == [(0.1,), (0.1,)]
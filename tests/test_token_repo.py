@@ -0,0 +1,124 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import fakeredis
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from repositories import token_repo
+from repositories.token_repo import RedisTokenRepository
+from services.auth_service import AuthService
+
+
+@pytest.fixture
+def repo():
+    redis = fakeredis.FakeAsyncRedis()
+    with patch.object(token_repo, "get_redis_pool"):
+        with patch.object(token_repo, "Redis", return_value=redis):
+            yield RedisTokenRepository()
+
+
+def refresh_token(expires_at: datetime) -> dict:
+    token = jwt.encode({"jti": uuid.uuid4().hex}, "test-secret-" + "x" * 32)
+    # Naive UTC, as create_refresh_token returns it.
+    return {"refresh_token": token, "expires_at": expires_at.replace(tzinfo=None)}
+
+
+def in_an_hour() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=1)
+
+
+def test_insert_stores_a_token_that_expires_with_it(repo):
+    user_id = uuid.uuid4()
+    token = refresh_token(in_an_hour())
+
+    async def run():
+        inserted = await repo.insert({**token, "user_id": user_id, "user_agent": "ua"})
+        found = await repo.get(refresh_token=token["refresh_token"])
+        ttl = await repo.redis.ttl(repo._token_key(inserted["id"]))
+        return inserted, found, ttl, await repo.get_all(user_id=user_id)
+
+    inserted, found, ttl, tokens = asyncio.run(run())
+    assert found["id"] == inserted["id"]
+    assert found["user_id"] == user_id
+    assert found["user_agent"] == "ua"
+    assert 3500 < ttl <= 3600
+    assert [token["id"] for token in tokens] == [inserted["id"]]
+
+
+def test_expired_tokens_are_gone(repo):
+    user_id = uuid.uuid4()
+    token = refresh_token(datetime.now(timezone.utc) - timedelta(seconds=1))
+
+    async def run():
+        await repo.insert({**token, "user_id": user_id})
+        return (
+            await repo.get(refresh_token=token["refresh_token"]),
+            await repo.get_all(user_id=user_id),
+            await repo.delete(refresh_token=token["refresh_token"]),
+        )
+
+    assert asyncio.run(run()) == (False, [], False)
+
+
+def test_a_token_is_revoked_only_once(repo):
+    user_id = uuid.uuid4()
+    token = refresh_token(in_an_hour())
+
+    async def run():
+        await repo.insert({**token, "user_id": user_id})
+        first, second = await asyncio.gather(
+            repo.delete(refresh_token=token["refresh_token"]),
+            repo.delete(refresh_token=token["refresh_token"]),
+        )
+        index = await repo.redis.zcard(repo._user_key(user_id))
+        return sorted([first, second]), index
+
+    assert asyncio.run(run()) == ([False, True], 0)
+
+
+def test_revoke_all_drops_every_token_of_the_user(repo):
+    user_id, other_id = uuid.uuid4(), uuid.uuid4()
+    tokens = [refresh_token(in_an_hour()) for _ in range(3)]
+
+    async def run():
+        for token in tokens[:2]:
+            await repo.insert({**token, "user_id": user_id})
+        await repo.insert({**tokens[2], "user_id": other_id})
+        revoked = await repo.delete(user_id=user_id)
+        return (
+            revoked,
+            await repo.get_all(user_id=user_id),
+            len(await repo.get_all(user_id=other_id)),
+            await repo.delete(user_id=user_id),
+        )
+
+    assert asyncio.run(run()) == (True, [], 1, False)
+
+
+def test_reusing_a_rotated_refresh_token_is_refused(repo):
+    user_id = uuid.uuid4()
+    token = refresh_token(in_an_hour())
+    security = MagicMock(decode_token=AsyncMock(return_value={"id": str(user_id)}))
+    service = AuthService(
+        user_repo=lambda: MagicMock(get=AsyncMock(return_value={"id": user_id})),
+        refresh_repo=lambda: repo,
+        cache_manager=MagicMock,
+        email_manager=MagicMock,
+        security_layer=lambda: security,
+        error_handler=HTTPException,
+        template_handler=None,
+    )
+    service._generate_token_pair = AsyncMock(return_value={"access_token": "a"})
+
+    async def run():
+        await repo.insert({**token, "user_id": user_id})
+        first = await service.recreate_access_handler(token)
+        with pytest.raises(HTTPException) as reused:
+            await service.recreate_access_handler(token)
+        return first, reused.value.status_code
+
+    assert asyncio.run(run()) == ({"access_token": "a"}, 401)
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import jwt
+import pytest
+
+from config import config_setting
+from core import tokens
+from core.security import JWTAuth
+from core.tokens import TokenCodec, TokenExpired, TokenInvalid, generate_private_key
+
+
+def test_leeway_and_errors():
+    codec = TokenCodec("HS256", secret="secret", leeway=10)
+    now = int(time.time())
+
+    assert codec.decode(codec.encode({"id": "1", "exp": now - 5}))["id"] == "1"
+    with pytest.raises(TokenExpired):
+        codec.decode(codec.encode({"id": "1", "exp": now - 60}))
+    with pytest.raises(TokenInvalid):
+        TokenCodec("HS256", secret="other").decode(codec.encode({"exp": now + 60}))
+    assert codec.jwks() == {"keys": []}
+
+
+@pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+def test_asymmetric_tokens_verify_against_the_published_jwks(algorithm):
+    pytest.importorskip("cryptography")
+
+    codec = TokenCodec(algorithm, private_key=generate_private_key(algorithm))
+    token = codec.encode({"id": "1", "exp": int(time.time()) + 60})
+    (jwk,) = codec.jwks()["keys"]
+
+    assert jwt.get_unverified_header(token)["kid"] == jwk["kid"]
+    assert "d" not in jwk
+    assert jwt.decode(token, jwt.PyJWK(jwk).key, algorithms=[algorithm])["id"] == "1"
+
+
+def test_bad_jwt_settings_fail_when_signing_not_when_constructing(monkeypatch):
+    monkeypatch.setattr(config_setting, "ALGORITHM", "str")
+    monkeypatch.setattr(tokens, "_token_codec", None)
+    auth = JWTAuth()
+
+    with pytest.raises(Exception, match="Unsupported JWT algorithm"):
+        asyncio.run(auth.create_access_token(data={"id": "1"}))
@@ -0,0 +1,87 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import database
+from utils.repository import SqlLayer
+
+
+class FakeSession:
+    def __init__(self):
+        self.add = MagicMock()
+        self.commit = AsyncMock()
+        self.flush = AsyncMock()
+        self.rollback = AsyncMock()
+        self.refresh = AsyncMock()
+        self.info = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def repository():
+    model = MagicMock(__name__="FakeModel")
+    model.return_value.to_dict = AsyncMock(return_value={"id": 1})
+
+    class FakeRepository(SqlLayer):
+        pass
+
+    FakeRepository.model = model
+    return FakeRepository()
+
+
+@pytest.fixture
+def sessions():
+    created = []
+
+    def factory():
+        created.append(FakeSession())
+        return created[-1]
+
+    with patch.object(database, "async_session_maker", factory), patch(
+        "utils.repository.async_session_maker", factory
+    ):
+        yield created
+
+
+def test_without_unit_of_work_each_call_commits(repository, sessions):
+    async def run():
+        await repository.insert({"id": 1})
+        await repository.insert({"id": 2})
+
+    asyncio.run(run())
+
+    assert len(sessions) == 2
+    assert all(s.commit.await_count == 1 for s in sessions)
+
+
+def test_unit_of_work_shares_one_session_and_commits_once(repository, sessions):
+    async def run():
+        async with database.unit_of_work():
+            await repository.insert({"id": 1})
+            await repository.insert({"id": 2})
+
+    asyncio.run(run())
+
+    assert len(sessions) == 1
+    assert sessions[0].flush.await_count == 2
+    assert sessions[0].commit.await_count == 1
+    assert database.current_session.get() is None
+
+
+def test_unit_of_work_rolls_back_on_error(repository, sessions):
+    async def run():
+        async with database.unit_of_work():
+            await repository.insert({"id": 1})
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+    assert sessions[0].commit.await_count == 0
+    assert sessions[0].rollback.await_count == 1